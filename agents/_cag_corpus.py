@@ -0,0 +1,37 @@
+"""静态知识语料 (Cache-Augmented Generation)
+
+knowledge/ 目录下的 Markdown 文档在导入时读取一次，按文件名排序拼接，
+作为提示词最前面的固定前缀，使模型服务端的前缀缓存能够跨请求复用，
+常见的基金基础知识问题无需再走工具或 RAG 检索。
+"""
+
+import hashlib
+import os
+
+KNOWLEDGE_DIR = os.path.join(os.path.dirname(__file__), "..", "knowledge")
+
+
+def _load_corpus(knowledge_dir: str) -> str:
+    """读取并拼接知识文档，目录不存在或为空时返回空字符串"""
+    if not os.path.isdir(knowledge_dir):
+        return ""
+
+    parts = []
+    for name in sorted(os.listdir(knowledge_dir)):
+        if name.endswith(".md"):
+            with open(os.path.join(knowledge_dir, name), "r", encoding="utf-8") as f:
+                parts.append(f.read().strip())
+
+    if not parts:
+        return ""
+
+    body = "\n\n".join(parts)
+    # 语料版本号随内容变化，便于确认缓存前缀是否已更新
+    rev = hashlib.sha1(body.encode("utf-8")).hexdigest()[:8]
+    return f"<!-- corpus_rev: {rev} -->\n## 参考知识库\n\n{body}\n\n---\n\n"
+
+
+CAG_BLOCK = _load_corpus(KNOWLEDGE_DIR)
+
+# 用于 str.format 模板的转义版本
+CAG_TEMPLATE_BLOCK = CAG_BLOCK.replace("{", "{{").replace("}", "}}")
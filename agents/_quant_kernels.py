@@ -0,0 +1,53 @@
+"""量化指标计算内核
+
+与 CodeInterpreterTool.calculate_metrics 的沙盒脚本使用相同公式，
+但在进程内直接用 NumPy 计算，省去生成脚本、启动子进程和 JSON 往返的开销。
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.03
+
+
+def compute_metrics(returns: Sequence[float], risk_free_rate: float = RISK_FREE_RATE) -> Dict[str, float]:
+    """计算日收益率序列的年化收益、波动率、夏普、最大回撤、索提诺、卡尔玛
+
+    Args:
+        returns: 日收益率序列
+        risk_free_rate: 年化无风险利率
+
+    Returns:
+        指标字典 (百分比指标已乘 100，全部保留两位小数)
+
+    Raises:
+        ValueError: 序列为空或包含非数值
+    """
+    r = np.ascontiguousarray(returns, dtype=np.float64)
+    if r.size == 0:
+        raise ValueError("收益率序列为空")
+
+    annual_return = r.mean() * TRADING_DAYS
+    annual_volatility = r.std() * np.sqrt(TRADING_DAYS)
+    sharpe_ratio = (annual_return - risk_free_rate) / annual_volatility if annual_volatility > 0 else 0
+
+    cumulative = np.cumprod(1 + r)
+    peak = np.maximum.accumulate(cumulative)
+    max_drawdown = ((peak - cumulative) / peak).max()
+
+    downside = r[r < 0]
+    downside_std = downside.std() * np.sqrt(TRADING_DAYS) if downside.size > 0 else 0
+    sortino_ratio = (annual_return - risk_free_rate) / downside_std if downside_std > 0 else 0
+
+    calmar_ratio = annual_return / max_drawdown if max_drawdown > 0 else 0
+
+    return {
+        "annual_return": round(float(annual_return) * 100, 2),
+        "annual_volatility": round(float(annual_volatility) * 100, 2),
+        "sharpe_ratio": round(float(sharpe_ratio), 2),
+        "max_drawdown": round(float(max_drawdown) * 100, 2),
+        "sortino_ratio": round(float(sortino_ratio), 2),
+        "calmar_ratio": round(float(calmar_ratio), 2)
+    }
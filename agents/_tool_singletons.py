@@ -0,0 +1,52 @@
+"""Agent 共享工具实例
+
+各 Agent 工厂共用同一组工具对象，避免每个 Agent 各自创建一份。
+工具模块在首次获取时才导入。
+"""
+
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tools.fund_tools import FundDataTool
+    from tools.portfolio_tools import PortfolioTool
+    from tools.intelligence_tools import IntelligenceTools
+    from tools.code_interpreter import CodeInterpreterTool
+
+
+# 单例
+_fund_tool: Optional["FundDataTool"] = None
+_portfolio_tool: Optional["PortfolioTool"] = None
+_intelligence_tool: Optional["IntelligenceTools"] = None
+_code_tool: Optional["CodeInterpreterTool"] = None
+
+
+def get_fund_tool() -> "FundDataTool":
+    global _fund_tool
+    if _fund_tool is None:
+        from tools.fund_tools import FundDataTool
+        _fund_tool = FundDataTool()
+    return _fund_tool
+
+
+def get_portfolio_tool() -> "PortfolioTool":
+    global _portfolio_tool
+    if _portfolio_tool is None:
+        from tools.portfolio_tools import PortfolioTool
+        _portfolio_tool = PortfolioTool()
+    return _portfolio_tool
+
+
+def get_intelligence_tool() -> "IntelligenceTools":
+    global _intelligence_tool
+    if _intelligence_tool is None:
+        from tools.intelligence_tools import IntelligenceTools
+        _intelligence_tool = IntelligenceTools()
+    return _intelligence_tool
+
+
+def get_code_tool() -> "CodeInterpreterTool":
+    global _code_tool
+    if _code_tool is None:
+        from tools.code_interpreter import CodeInterpreterTool
+        _code_tool = CodeInterpreterTool()
+    return _code_tool
@@ -2,14 +2,14 @@
 
 from typing import Optional
 from hello_agents import HelloAgentsLLM, PlanAndSolveAgent
+from ._cag_corpus import CAG_TEMPLATE_BLOCK
 
 # 自定义规划 Prompt
+# 规划模板以静态知识库开头，{question} 置于末尾以复用前缀缓存
 ADVISOR_PROMPTS = {
-    "planner": """你是一位专业的投资顾问，擅长制定投资计划。
+    "planner": CAG_TEMPLATE_BLOCK + """你是一位专业的投资顾问，擅长制定投资计划。
 
-请将以下投资规划任务分解为清晰的执行步骤：
-
-投资规划任务: {question}
+请将给定的投资规划任务分解为清晰的执行步骤。
 
 请按以下格式输出规划方案：
 ```python
@@ -22,6 +22,8 @@ ADVISOR_PROMPTS = {
 3. 制定资产配置方案
 4. 给出具体的基金推荐
 5. 提供风险提示
+
+投资规划任务: {question}
 """,
     
     "executor": """你是一位投资顾问，请执行投资规划的具体步骤。
@@ -2,12 +2,13 @@
 
 from typing import Optional
 from hello_agents import HelloAgentsLLM, ReflectionAgent
+from ._cag_corpus import CAG_TEMPLATE_BLOCK
 
 # 自定义反思 Prompt
+# 各模板的固定说明在前，{task} 等变量置于末尾以复用前缀缓存；
+# 初始分析模板额外以静态知识库开头
 ANALYST_PROMPTS = {
-    "initial": """你是一位资深的基金技术分析师。请分析以下基金或市场情况：
-
-分析任务: {task}
+    "initial": CAG_TEMPLATE_BLOCK + """你是一位资深的基金技术分析师。请分析给定的基金或市场情况。
 
 请提供详细的技术分析报告，包括：
 1. **趋势分析**: 判断当前趋势方向
@@ -15,12 +16,11 @@ ANALYST_PROMPTS = {
 3. **技术指标**: MA、RSI、MACD 等指标解读
 4. **量能分析**: 成交量配合情况
 5. **综合判断**: 短期和中期走势预判
+
+分析任务: {task}
 """,
     
-    "reflect": """请审查以下技术分析报告的质量：
-
-# 原始任务: {task}
-# 分析报告: {content}
+    "reflect": """请审查下面技术分析报告的质量。
 
 请从以下角度评估：
 - 分析逻辑是否清晰
@@ -30,19 +30,19 @@ ANALYST_PROMPTS = {
 
 如果分析已经很完善，请回答"无需改进"。
 否则请提出具体的改进建议。
+
+# 原始任务: {task}
+# 分析报告: {content}
 """,
     
-    "refine": """请根据审查意见优化技术分析报告：
+    "refine": """请根据审查意见优化技术分析报告，提供优化后的分析报告。
 
 # 原始任务: {task}
 # 上一轮报告: {last_attempt}
 # 审查意见: {feedback}
-
-请提供优化后的分析报告。
 """
 }
 
-
 def create_analyst_agent(llm: Optional[HelloAgentsLLM] = None) -> ReflectionAgent:
     """创建技术分析 Agent（使用反思范式）
     
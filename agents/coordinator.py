@@ -1,9 +1,12 @@
 """CoordinatorAgent - 使用 HelloAgents ReActAgent"""
 
 from typing import Optional
-from hello_agents import HelloAgentsLLM, ReActAgent, ToolRegistry
+from hello_agents import HelloAgentsLLM, ParallelReActAgent, ToolRegistry
+from ._tool_singletons import get_fund_tool, get_portfolio_tool
 
 # 自定义 Prompt 模板
+# 静态内容（角色、工具、意图分类、输出格式）在前，{question}/{history} 严格置于末尾，
+# 使每次调用的提示词前缀保持一致，以命中模型服务端的前缀缓存。
 COORDINATOR_PROMPT = """你是基金估值助手的协调员，负责理解用户意图并调用合适的工具。
 
 ## 可用工具
@@ -20,29 +23,30 @@ COORDINATOR_PROMPT = """你是基金估值助手的协调员，负责理解用
 - **持仓管理**: 用户想添加、删除持仓
 - **投资建议**: 用户询问投资策略、建议
 
-## 当前任务
-**用户问题:** {question}
-
-## 执行历史
-{history}
-
 请按以下格式推理和行动：
 
 Thought: 分析用户意图，确定需要什么信息
 Action: 调用工具获取信息
 - `{{tool_name}}[{{参数}}]`：调用工具
 - `Finish[最终回答]`：当你有足够信息回答时
-"""
 
+多个互不依赖的工具调用可以在同一个 Action 中每行写一个，它们会被并行执行。
 
-def create_coordinator_agent(llm: Optional[HelloAgentsLLM] = None) -> ReActAgent:
+## 当前任务
+**用户问题:** {question}
+
+## 执行历史
+{history}
+"""
+
+def create_coordinator_agent(llm: Optional[HelloAgentsLLM] = None) -> ParallelReActAgent:
     """创建协调员 Agent
     
     Args:
         llm: LLM 实例，如果不提供则自动创建
     
     Returns:
-        配置好的 ReActAgent 实例
+        配置好的 ParallelReActAgent 实例
     """
     if llm is None:
         llm = HelloAgentsLLM()
@@ -51,18 +55,15 @@ def create_coordinator_agent(llm: Optional[HelloAgentsLLM] = None) -> ReActAgent
     tool_registry = ToolRegistry()
     
     # 注册基金数据工具
-    from tools.fund_tools import FundDataTool
-    from tools.portfolio_tools import PortfolioTool
-    
-    fund_tool = FundDataTool()
-    portfolio_tool = PortfolioTool()
+    fund_tool = get_fund_tool()
+    portfolio_tool = get_portfolio_tool()
     
     # 使用 add_tool 自动展开可展开的工具
     tool_registry.register_tool(fund_tool)
     tool_registry.register_tool(portfolio_tool)
     
-    # 创建 ReActAgent
-    agent = ReActAgent(
+    # 创建 ReActAgent (同一步内的多个工具调用并行执行)
+    agent = ParallelReActAgent(
         name="协调员",
         llm=llm,
         tool_registry=tool_registry,
@@ -7,10 +7,13 @@
 - 知识图谱增强检索 (GraphRAG)
 """
 
+import asyncio
+from itertools import chain
 from typing import Optional, Dict, List
-from hello_agents import HelloAgentsLLM, ReActAgent, ToolRegistry
+from hello_agents import HelloAgentsLLM, ParallelReActAgent, ToolRegistry
+from ._tool_singletons import get_fund_tool, get_intelligence_tool
 
-# 情报分析 Prompt
+# 情报分析 Prompt (静态内容在前，{question}/{history} 置于末尾以复用前缀缓存)
 INTELLIGENCE_PROMPT = """你是市场情报侦察兵（Market Intelligence Agent），负责收集和分析市场信息。
 
 ## 你的能力
@@ -43,18 +46,20 @@ INTELLIGENCE_PROMPT = """你是市场情报侦察兵（Market Intelligence Agent
 - 中长期趋势
 - 风险提示
 
-## 当前任务
-**用户问题:** {question}
-
-## 已收集信息
-{history}
-
 请按以下格式推理：
 
 Thought: 分析需要什么信息，选择合适的工具
 Action: 
 - `{{tool_name}}[{{参数}}]`：调用工具获取信息
 - `Finish[情报分析报告]`：当信息充足时给出综合分析
+
+多个互不依赖的工具调用可以在同一个 Action 中每行写一个，它们会被并行执行。
+
+## 当前任务
+**用户问题:** {question}
+
+## 已收集信息
+{history}
 """
 
 
@@ -81,19 +86,21 @@ class EntityRelationExtractor:
         "腾讯": ["字节跳动", "网易"],
     }
     
+    # 全部已知实体（去重并保持定义顺序），类加载时计算一次
+    _ALL_ENTITIES = tuple(dict.fromkeys(chain(
+        SUPPLY_CHAIN, COMPETITORS, *SUPPLY_CHAIN.values(), *COMPETITORS.values()
+    )))
+    
+    # 供应链倒排索引: 下游实体 -> 上游实体列表
+    _UPSTREAM: Dict[str, List[str]] = {}
+    for _upstream, _downstreams in SUPPLY_CHAIN.items():
+        for _downstream in _downstreams:
+            _UPSTREAM.setdefault(_downstream, []).append(_upstream)
+    del _upstream, _downstreams, _downstream
+    
     def extract_entities(self, text: str) -> List[str]:
         """从文本提取实体"""
-        entities = []
-        all_entities = set(self.SUPPLY_CHAIN.keys()) | set(self.COMPETITORS.keys())
-        for key in all_entities:
-            for related in self.SUPPLY_CHAIN.get(key, []) + self.COMPETITORS.get(key, []):
-                all_entities.add(related)
-        
-        for entity in all_entities:
-            if entity in text:
-                entities.append(entity)
-        
-        return entities
+        return [entity for entity in self._ALL_ENTITIES if entity in text]
     
     def get_relations(self, entity: str) -> Dict:
         """获取实体的关系网络"""
@@ -101,7 +108,7 @@ class EntityRelationExtractor:
             "entity": entity,
             "supply_chain": self.SUPPLY_CHAIN.get(entity, []),
             "competitors": self.COMPETITORS.get(entity, []),
-            "upstream": [k for k, v in self.SUPPLY_CHAIN.items() if entity in v]
+            "upstream": list(self._UPSTREAM.get(entity, ()))
         }
     
     def expand_query(self, query: str) -> str:
@@ -121,11 +128,19 @@ class EntityRelationExtractor:
 
 # ============ Intelligence Agent ============
 
+class IntelligenceAgent(ParallelReActAgent):
+    """携带知识图谱扩展器的情报 ReActAgent"""
+
+    def __init__(self, *args, entity_extractor: Optional[EntityRelationExtractor] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.entity_extractor = entity_extractor
+
+
 def create_intelligence_agent(
     llm: Optional[HelloAgentsLLM] = None,
     rag_tool=None,
     enable_graph_rag: bool = True
-) -> ReActAgent:
+) -> IntelligenceAgent:
     """创建市场情报侦察兵 Agent
     
     Args:
@@ -134,7 +149,7 @@ def create_intelligence_agent(
         enable_graph_rag: 是否启用知识图谱增强
     
     Returns:
-        配置好的 ReActAgent 实例
+        配置好的 IntelligenceAgent 实例
     """
     if llm is None:
         llm = HelloAgentsLLM()
@@ -143,32 +158,28 @@ def create_intelligence_agent(
     tool_registry = ToolRegistry()
     
     # 注册情报工具
-    from tools.intelligence_tools import IntelligenceTools
-    intel_tool = IntelligenceTools()
+    intel_tool = get_intelligence_tool()
     tool_registry.register_tool(intel_tool)
     
     # 注册基金数据工具（用于交叉验证）
-    from tools.fund_tools import FundDataTool
-    fund_tool = FundDataTool()
+    fund_tool = get_fund_tool()
     tool_registry.register_tool(fund_tool)
     
     # 注册 RAG 工具
     if rag_tool:
         tool_registry.register_tool(rag_tool)
     
-    # 创建 ReActAgent
-    agent = ReActAgent(
+    # 创建 ReActAgent (同一步内的多个工具调用并行执行)
+    agent = IntelligenceAgent(
         name="市场情报侦察兵",
         llm=llm,
         tool_registry=tool_registry,
         custom_prompt=INTELLIGENCE_PROMPT,
-        max_steps=8  # 允许更多步骤收集信息
+        max_steps=8,  # 允许更多步骤收集信息
+        # 知识图谱扩展器
+        entity_extractor=EntityRelationExtractor() if enable_graph_rag else None
     )
     
-    # 附加知识图谱扩展器
-    if enable_graph_rag:
-        agent._entity_extractor = EntityRelationExtractor()
-    
     return agent
 
 
@@ -177,7 +188,8 @@ class IntelligenceAgentWrapper:
     
     def __init__(self, llm: Optional[HelloAgentsLLM] = None):
         self._agent = create_intelligence_agent(llm)
-        self._entity_extractor = EntityRelationExtractor()
+        self._entity_extractor = self._agent.entity_extractor
+        self._intel_tool = get_intelligence_tool()
     
     def run(self, query: str, expand_with_graph: bool = True) -> str:
         """执行情报分析
@@ -208,16 +220,15 @@ class IntelligenceAgentWrapper:
         # 执行 Agent
         return self._agent.run(query)
     
-    def analyze_entity(self, entity: str) -> Dict:
+    async def analyze_entity(self, entity: str) -> Dict:
         """分析特定实体的市场情报"""
         relations = self._entity_extractor.get_relations(entity)
         
-        # 搜索实体相关信息
-        from tools.intelligence_tools import IntelligenceTools
-        intel_tool = IntelligenceTools()
-        
-        search_result = intel_tool.web_search(entity, limit=3)
-        news_result = intel_tool.get_news(entity, limit=3)
+        # 搜索与新闻互不依赖，并发请求
+        search_result, news_result = await asyncio.gather(
+            asyncio.to_thread(self._intel_tool.web_search, entity, limit=3),
+            asyncio.to_thread(self._intel_tool.get_news, entity, limit=3)
+        )
         
         return {
             "entity": entity,
@@ -225,6 +236,10 @@ class IntelligenceAgentWrapper:
             "search": search_result,
             "news": news_result
         }
+    
+    def analyze_entity_sync(self, entity: str) -> Dict:
+        """analyze_entity 的同步版本（不可在运行中的事件循环内调用）"""
+        return asyncio.run(self.analyze_entity(entity))
 
 
 if __name__ == "__main__":
@@ -9,8 +9,16 @@
 - 代码自我审查
 """
 
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
 from typing import Optional, Dict, Any
+import numpy as np
 from hello_agents import HelloAgentsLLM, SimpleAgent, ToolRegistry
+from ._tool_singletons import get_fund_tool, get_code_tool
+from ._quant_kernels import compute_metrics
 
 # 量化分析系统提示词 (增强版)
 QUANT_SYSTEM_PROMPT = """你是一位专业的量化分析师，负责分析基金的量化指标和收益归因。
@@ -69,39 +77,49 @@ class CodeReviewer:
         "edge_case": "检查边界情况（如除零、负数开方等）"
     }
     
+    # 审查所需的代码特征 (名称, 正则)；新增规则只需在此追加，仍合并为单个正则一次扫描
+    _FEATURES = (
+        ("div0", r"/ ?0"),
+        ("nan_handled", r"np\.nan|dropna"),
+        ("mean_std", r"mean|std"),
+        ("sqrt", r"sqrt"),
+        ("minus", r"-"),
+    )
+    _FEATURE_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in _FEATURES))
+    
+    # (指标, 下限, 上限, 提示模板)
+    _RANGE_CHECKS = (
+        ("sharpe_ratio", -5, 5, "夏普比率 {} 超出正常范围 [-5, 5]"),
+        ("max_drawdown", 0, 100, "最大回撤 {}% 超出正常范围 [0, 100]"),
+    )
+    
     def review(self, code: str, result: str) -> Dict[str, Any]:
         """审查代码和结果"""
         issues = []
         
         # 检查常见问题
-        if "/ 0" in code or "/0" in code:
+        features = {m.lastgroup for m in self._FEATURE_RE.finditer(code)}
+        
+        if "div0" in features:
             issues.append("可能存在除零错误")
         
-        if "np.nan" not in code and "dropna" not in code:
-            if "mean" in code or "std" in code:
-                issues.append("未处理缺失值，可能影响均值/标准差计算")
+        if "mean_std" in features and "nan_handled" not in features:
+            issues.append("未处理缺失值，可能影响均值/标准差计算")
         
-        if "sqrt" in code and "-" in code:
+        if "sqrt" in features and "minus" in features:
             issues.append("注意负数开方问题")
         
         # 检查结果合理性
         try:
-            import json
             result_data = json.loads(result) if isinstance(result, str) else result
             
             if isinstance(result_data, dict):
-                # 检查夏普比率范围
-                if "sharpe_ratio" in result_data:
-                    sr = result_data["sharpe_ratio"]
-                    if sr > 5 or sr < -5:
-                        issues.append(f"夏普比率 {sr} 超出正常范围 [-5, 5]")
-                
-                # 检查回撤范围
-                if "max_drawdown" in result_data:
-                    md = result_data["max_drawdown"]
-                    if md > 100 or md < 0:
-                        issues.append(f"最大回撤 {md}% 超出正常范围 [0, 100]")
-        except:
+                for metric, low, high, message in self._RANGE_CHECKS:
+                    if metric in result_data:
+                        value = result_data[metric]
+                        if value > high or value < low:
+                            issues.append(message.format(value))
+        except (ValueError, TypeError):
             pass
         
         return {
@@ -132,13 +150,11 @@ def create_quant_agent(llm: Optional[HelloAgentsLLM] = None) -> SimpleAgent:
     tool_registry = ToolRegistry()
     
     # 注册基金数据工具
-    from tools.fund_tools import FundDataTool
-    fund_tool = FundDataTool()
+    fund_tool = get_fund_tool()
     tool_registry.register_tool(fund_tool)
     
     # 注册代码解释器 (核心增强)
-    from tools.code_interpreter import CodeInterpreterTool
-    code_tool = CodeInterpreterTool()
+    code_tool = get_code_tool()
     tool_registry.register_tool(code_tool)
     
     # 创建 SimpleAgent
@@ -154,13 +170,41 @@ def create_quant_agent(llm: Optional[HelloAgentsLLM] = None) -> SimpleAgent:
 
 
 class QuantAgentWrapper:
-    """量化 Agent 包装器 - 支持代码审查"""
+    """量化 Agent 包装器 - 支持代码审查
+    
+    对相同的查询 / 收益率序列缓存结果 (LRU)，避免重复调用 LLM 和重复计算指标。
+    查询结果依赖实时行情，只缓存成功的回答，并在 RUN_CACHE_TTL 秒后过期。
+    """
+    
+    CACHE_SIZE = 512
+    RUN_CACHE_TTL = 600
+    # 失败 / 兜底回答的特征，这类结果不缓存
+    FAILURE_MARKERS = ("抱歉，我无法", "❌")
     
     def __init__(self, llm: Optional[HelloAgentsLLM] = None):
         self._agent = create_quant_agent(llm)
         self._reviewer = CodeReviewer()
         self._last_code = ""
         self._last_result = ""
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+    
+    def _cache_get(self, key: str) -> Any:
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+        return value
+    
+    def _cache_set(self, key: str, value: Any):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    def _is_cacheable(self, result: Any) -> bool:
+        """仅缓存非空且不含失败特征的回答"""
+        if not isinstance(result, str) or not result.strip():
+            return False
+        return not any(marker in result for marker in self.FAILURE_MARKERS)
     
     def run(self, query: str, auto_review: bool = True) -> str:
         """执行量化分析
@@ -172,7 +216,16 @@ class QuantAgentWrapper:
         Returns:
             分析报告
         """
-        result = self._agent.run(query)
+        key = "query:" + hashlib.blake2b(query.strip().lower().encode()).hexdigest()
+        entry = self._cache_get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            result = entry[1]
+        else:
+            result = self._agent.run(query)
+            if self._is_cacheable(result):
+                self._cache_set(key, (time.monotonic() + self.RUN_CACHE_TTL, result))
+            elif entry is not None:
+                self._cache.pop(key, None)
         
         # 如果启用自动审查且有代码执行
         if auto_review and self._last_code:
@@ -190,14 +243,23 @@ class QuantAgentWrapper:
         verify: bool = True
     ) -> Dict[str, Any]:
         """计算量化指标（带验证）"""
-        from tools.code_interpreter import CodeInterpreterTool
+        # 执行计算 (相同序列直接复用缓存结果；回撤等指标与顺序相关，不做排序)
+        # 公式固定，直接在进程内计算，不经过代码解释器沙盒
+        try:
+            series = np.ascontiguousarray(returns, dtype=np.float64)
+        except (ValueError, TypeError) as e:
+            return {"success": False, "error": str(e)}
         
-        code_tool = CodeInterpreterTool()
+        key = "metrics:" + hashlib.sha256(series.tobytes()).hexdigest()
+        metrics = self._cache_get(key)
+        if metrics is None:
+            try:
+                metrics = compute_metrics(series)
+            except ValueError as e:
+                return {"success": False, "error": str(e)}
+            self._cache_set(key, metrics)
         
-        # 执行计算
-        import json
-        result = code_tool.calculate_metrics(json.dumps(returns))
-        result_data = json.loads(result)
+        result_data = {"success": True, "metrics": dict(metrics)}
         
         if verify and result_data.get("success"):
             # 验证结果合理性
@@ -7,32 +7,45 @@
 - 生成跟投建议
 """
 
+import asyncio
 from typing import Optional, Dict, Any, List
-from hello_agents import HelloAgentsLLM, ReActAgent, ToolRegistry
+from hello_agents import HelloAgentsLLM, ParallelReActAgent, ToolRegistry
+from ._tool_singletons import get_fund_tool
 from tools.base_shim import Tool, tool_action, ToolParameter
 import json
 
 
 # ============ Shadow Analyst Tools ============
 
+def _dumps(obj: Any) -> str:
+    """序列化工具结果：结果直接作为 Observation 拼入提示词，使用紧凑分隔符减少体积"""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 class ShadowAnalystTool(Tool):
     """影子基金经理分析工具"""
     
-    def __init__(self):
+    def __init__(self, service=None):
+        """
+        Args:
+            service: 可选的 ShadowTrackerService 实例，默认使用全局单例
+        """
         super().__init__(
             name="shadow_analyst",
             description="分析博主投资水平：持仓获取、业绩归因、排行榜",
             expandable=True
         )
+        if service is None:
+            from services.shadow_tracker_service import get_shadow_service
+            service = get_shadow_service()
+        self._service = service
     
     @tool_action("get_portfolio", "获取博主持仓组合")
     def get_portfolio(self, blogger_id: int) -> str:
         """获取博主的影子组合"""
-        from services.shadow_tracker_service import get_shadow_service
-        
-        service = get_shadow_service()
+        service = self._service
         portfolio = service.build_shadow_portfolio(blogger_id)
-        return json.dumps(portfolio.to_dict(), ensure_ascii=False)
+        return _dumps(portfolio.to_dict())
     
     @tool_action("analyze_performance", "分析博主业绩")
     async def analyze_performance(self, blogger_id: int, period: str = "3M") -> str:
@@ -40,11 +53,9 @@ class ShadowAnalystTool(Tool):
         
         返回收益率、Alpha、夏普比率、选股胜率等
         """
-        from services.shadow_tracker_service import get_shadow_service
-        
-        service = get_shadow_service()
+        service = self._service
         metrics = await service.analyze_performance(blogger_id, period)
-        return json.dumps(metrics.to_dict(), ensure_ascii=False)
+        return _dumps(metrics.to_dict())
     
     @tool_action("get_ranking", "获取博主排行榜")
     def get_ranking(
@@ -54,20 +65,16 @@ class ShadowAnalystTool(Tool):
         limit: int = 10
     ) -> str:
         """获取博主排行榜"""
-        from services.shadow_tracker_service import get_shadow_service
-        
-        service = get_shadow_service()
+        service = self._service
         ranking = service.get_blogger_ranking(period, sort_by, limit)
-        return json.dumps(ranking, ensure_ascii=False)
+        return _dumps(ranking)
     
     @tool_action("list_bloggers", "列出追踪的博主")
     def list_bloggers(self) -> str:
         """列出所有追踪的博主"""
-        from services.shadow_tracker_service import get_shadow_service
-        
-        service = get_shadow_service()
+        service = self._service
         bloggers = service.list_bloggers()
-        return json.dumps([b.to_dict() for b in bloggers], ensure_ascii=False)
+        return _dumps([b.to_dict() for b in bloggers])
     
     def run(self, parameters: Dict[str, Any]) -> str:
         action = parameters.get("action", "list_bloggers")
@@ -83,7 +90,7 @@ class ShadowAnalystTool(Tool):
         elif action == "list_bloggers":
             return self.list_bloggers()
         
-        return json.dumps({"error": "未知操作"})
+        return _dumps({"error": "未知操作"})
     
     def get_parameters(self) -> List[ToolParameter]:
         return [
@@ -97,6 +104,7 @@ class ShadowAnalystTool(Tool):
 
 
 # ============ Shadow Analyst Prompt ============
+# 静态内容在前，{question}/{history} 置于末尾以复用前缀缓存
 
 SHADOW_ANALYST_PROMPT = """你是影子基金经理分析师，专门分析社交媒体上公开持仓博主的投资水平。
 
@@ -139,42 +147,50 @@ SHADOW_ANALYST_PROMPT = """你是影子基金经理分析师，专门分析社
 ⭐⭐ 不建议跟投
 ⭐ 警惕风险
 
-## 当前任务
-**用户问题:** {question}
-
-## 已收集信息
-{history}
-
 请按以下格式推理：
 
 Thought: 分析需要获取哪些数据
 Action: 
 - `{{tool_name}}[{{参数}}]`：获取数据
 - `Finish[博主分析报告]`：给出综合评估
+
+多个互不依赖的工具调用可以在同一个 Action 中每行写一个，它们会被并行执行。
+
+## 当前任务
+**用户问题:** {question}
+
+## 已收集信息
+{history}
 """
 
 
 # ============ Shadow Analyst Agent ============
 
 def create_shadow_analyst_agent(
-    llm: Optional[HelloAgentsLLM] = None
-) -> ReActAgent:
-    """创建影子基金经理分析 Agent"""
+    llm: Optional[HelloAgentsLLM] = None,
+    service=None
+) -> ParallelReActAgent:
+    """创建影子基金经理分析 Agent
+    
+    Args:
+        llm: 可选的 LLM 实例
+        service: 可选的 ShadowTrackerService 实例，默认使用全局单例
+    """
     if llm is None:
         llm = HelloAgentsLLM()
     
     tool_registry = ToolRegistry()
     
     # 注册影子分析工具
-    shadow_tool = ShadowAnalystTool()
+    shadow_tool = ShadowAnalystTool(service)
     tool_registry.register_tool(shadow_tool)
     
     # 注册基金数据工具 (用于验证持仓)
-    from tools.fund_tools import FundDataTool
-    fund_tool = FundDataTool()
+    fund_tool = get_fund_tool()
     tool_registry.register_tool(fund_tool)
     
-    agent = ReActAgent(
+    # 同一步内的多个工具调用并行执行
+    agent = ParallelReActAgent(
         name="影子分析师",
         llm=llm,
         tool_registry=tool_registry,
@@ -188,8 +204,12 @@ def create_shadow_analyst_agent(
 class ShadowAnalystWrapper:
     """影子分析师包装器"""
     
-    def __init__(self, llm: Optional[HelloAgentsLLM] = None):
-        self._agent = create_shadow_analyst_agent(llm)
+    def __init__(self, llm: Optional[HelloAgentsLLM] = None, service=None):
+        if service is None:
+            from services.shadow_tracker_service import get_shadow_service
+            service = get_shadow_service()
+        self._service = service
+        self._agent = create_shadow_analyst_agent(llm, service)
     
     def run(self, query: str) -> str:
         """执行分析"""
@@ -219,10 +239,45 @@ class ShadowAnalystWrapper:
             "risks": ["回撤控制一般", "数据样本较少"]
         }
     
-    def compare_bloggers(self, blogger_ids: List[int]) -> str:
-        """比较多个博主"""
-        ids_str = ", ".join(map(str, blogger_ids))
-        return self._agent.run(f"比较以下博主的投资水平: {ids_str}")
+    async def compare_bloggers(self, blogger_ids: List[int], period: str = "3M") -> str:
+        """比较多个博主
+        
+        先并发获取所有博主的持仓与业绩，再让 LLM 在单轮内基于完整数据做比较，
+        无需在 ReAct 循环中逐个调用工具。
+        """
+        service = self._service
+        portfolios, performances = await asyncio.gather(
+            asyncio.gather(
+                *[asyncio.to_thread(service.build_shadow_portfolio, b) for b in blogger_ids],
+                return_exceptions=True
+            ),
+            asyncio.gather(
+                *[service.analyze_performance(b, period) for b in blogger_ids],
+                return_exceptions=True
+            )
+        )
+        
+        sections = []
+        for blogger_id, portfolio, metrics in zip(blogger_ids, portfolios, performances):
+            if isinstance(portfolio, Exception):
+                sections.append(f"### 博主ID={blogger_id}\n数据获取失败: {portfolio}")
+                continue
+            lines = [f"### {portfolio.blogger_name} (ID={blogger_id})"]
+            lines.append(f"持仓: {_dumps([h.to_dict() for h in portfolio.holdings])}")
+            if isinstance(metrics, Exception):
+                lines.append(f"业绩({period}): 获取失败: {metrics}")
+            else:
+                lines.append(f"业绩({period}): {_dumps(metrics.to_dict())}")
+            sections.append("\n".join(lines))
+        
+        prompt = (
+            f"请基于以下已收集的数据，比较这些博主的投资水平（收益能力、风险控制、选股与择时能力、风格稳定性），"
+            f"并给出各自的跟投建议评级。\n\n" + "\n\n".join(sections)
+        )
+        return await asyncio.to_thread(
+            self._agent.llm.invoke,
+            [{"role": "user", "content": prompt}]
+        )
 
 
 if __name__ == "__main__":
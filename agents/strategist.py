@@ -9,8 +9,11 @@
 - Plan-and-Solve (目标拆解)
 """
 
-from typing import Optional, Dict, Any, List
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple
 from hello_agents import HelloAgentsLLM, ReActAgent, ToolRegistry
+from ._tool_singletons import get_fund_tool, get_portfolio_tool
+from ._cag_corpus import CAG_TEMPLATE_BLOCK
 from dataclasses import dataclass
 from enum import Enum
 
@@ -24,15 +27,16 @@ class RiskProfile(Enum):
     CONSERVATIVE = "conservative"  # 保守型
 
 
-@dataclass
+@dataclass(frozen=True)
 class UserPersona:
-    """用户画像"""
+    """用户画像 (不可变，可哈希)"""
     risk_profile: RiskProfile
     investment_horizon: str  # 短期/中期/长期
     age_group: str           # 青年/中年/退休
     investment_goal: str     # 增值/保值/养老
-    preference_tags: List[str]  # 偏好标签
+    preference_tags: Tuple[str, ...]  # 偏好标签
     
+    @lru_cache(maxsize=None)
     def to_prompt_context(self) -> str:
         """转换为 Prompt 上下文"""
         profile_desc = {
@@ -58,21 +62,21 @@ USER_PERSONAS = {
         investment_horizon="长期(5年+)",
         age_group="青年",
         investment_goal="财富增值",
-        preference_tags=["科技", "成长", "港美股", "主题基金"]
+        preference_tags=("科技", "成长", "港美股", "主题基金")
     ),
     "balanced": UserPersona(
         risk_profile=RiskProfile.BALANCED,
         investment_horizon="中期(2-5年)",
         age_group="中年",
         investment_goal="稳健增值",
-        preference_tags=["蓝筹", "混合型", "指数增强"]
+        preference_tags=("蓝筹", "混合型", "指数增强")
     ),
     "conservative": UserPersona(
         risk_profile=RiskProfile.CONSERVATIVE,
         investment_horizon="短期(1年内)",
         age_group="退休",
         investment_goal="保本理财",
-        preference_tags=["债券", "货币基金", "固收+"]
+        preference_tags=("债券", "货币基金", "固收+")
     )
 }
 
@@ -118,11 +122,10 @@ COT_DECISION_FRAMEWORK = """
 
 
 # ============ 策略师 Prompt ============
+# 静态内容在前，{question}/{history} 置于末尾以复用前缀缓存
 
 STRATEGIST_PROMPT = """你是首席投资策略师(CIO)，负责综合各方意见做出最终投资决策。
 
-{persona_context}
-
 {cot_framework}
 
 ## 可用工具
@@ -134,20 +137,45 @@ STRATEGIST_PROMPT = """你是首席投资策略师(CIO)，负责综合各方意
 3. **链条清晰**: 每个建议都有明确的推理过程
 4. **风险可控**: 永远将风险提示放在首位
 
-## 当前任务
-**用户问题:** {question}
-
-## 已收集信息
-{history}
-
 请按以下格式推理：
 
 Thought: [决策链条 Step 1-5]
 Action: 
 - `{{tool_name}}[{{参数}}]`：获取更多信息
 - `Finish[投资建议报告]`：给出综合建议
+
+## 当前任务
+**用户问题:** {question}
+
+## 已收集信息
+{history}
 """
 
+# 模块加载时预渲染静态部分 (知识库 + 决策框架)；用户画像随问题传入，不影响系统提示词前缀
+_STRATEGIST_STATIC = CAG_TEMPLATE_BLOCK + STRATEGIST_PROMPT.replace("{cot_framework}", COT_DECISION_FRAMEWORK)
+
+
+class StrategistAgent(ReActAgent):
+    """携带用户画像的策略师 ReActAgent
+
+    画像上下文拼接在用户问题前，而不是写入提示词模板，
+    切换画像时无需重建 Agent，提示词静态前缀保持不变。
+    """
+
+    def __init__(self, *args, persona: UserPersona, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.persona = persona
+
+    def _with_persona(self, input_text: str) -> str:
+        return f"{self.persona.to_prompt_context()}\n{input_text}"
+
+    def run(self, input_text: str, **kwargs) -> str:
+        return super().run(self._with_persona(input_text), **kwargs)
+
+    async def stream_run(self, input_text: str, **kwargs):
+        async for chunk in super().stream_run(self._with_persona(input_text), **kwargs):
+            yield chunk
+
 
 # ============ Enhanced Strategist Agent ============
 
@@ -156,7 +184,7 @@ def create_strategist_agent(
     memory_tool=None,
     rag_tool=None,
     user_persona: str = "balanced"  # 新增：用户画像
-) -> ReActAgent:
+) -> StrategistAgent:
     """创建增强版策略师 Agent
     
     Args:
@@ -166,7 +194,7 @@ def create_strategist_agent(
         user_persona: 用户画像类型 (aggressive/balanced/conservative)
     
     Returns:
-        配置好的 ReActAgent 实例
+        配置好的 StrategistAgent 实例
     """
     if llm is None:
         llm = HelloAgentsLLM()
@@ -175,11 +203,8 @@ def create_strategist_agent(
     tool_registry = ToolRegistry()
     
     # 注册基础工具
-    from tools.fund_tools import FundDataTool
-    from tools.portfolio_tools import PortfolioTool
-    
-    fund_tool = FundDataTool()
-    portfolio_tool = PortfolioTool()
+    fund_tool = get_fund_tool()
+    portfolio_tool = get_portfolio_tool()
     
     tool_registry.register_tool(fund_tool)
     tool_registry.register_tool(portfolio_tool)
@@ -192,26 +217,19 @@ def create_strategist_agent(
     if rag_tool:
         tool_registry.register_tool(rag_tool)
     
-    # 获取用户画像上下文
+    # 获取用户画像
     persona = USER_PERSONAS.get(user_persona, USER_PERSONAS["balanced"])
-    persona_context = persona.to_prompt_context()
-    
-    # 构建完整 Prompt
-    full_prompt = STRATEGIST_PROMPT.replace("{persona_context}", persona_context)
-    full_prompt = full_prompt.replace("{cot_framework}", COT_DECISION_FRAMEWORK)
     
     # 创建 ReActAgent
-    agent = ReActAgent(
+    agent = StrategistAgent(
         name="首席策略师",
         llm=llm,
         tool_registry=tool_registry,
-        custom_prompt=full_prompt,
-        max_steps=6
+        custom_prompt=_STRATEGIST_STATIC,
+        max_steps=6,
+        persona=persona
     )
     
-    # 附加用户画像信息
-    agent._user_persona = persona
-    
     return agent
 
 
@@ -235,10 +253,7 @@ class StrategistAgentWrapper:
         """
         if persona_type in USER_PERSONAS:
             self._current_persona = persona_type
-            self._agent = create_strategist_agent(
-                self._llm, 
-                user_persona=persona_type
-            )
+            self._agent.persona = USER_PERSONAS[persona_type]
     
     def run(self, query: str) -> str:
         """执行策略分析"""
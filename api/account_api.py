@@ -4,28 +4,34 @@ P3 Feature: Create/manage multiple portfolio accounts
 """
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict
 from datetime import datetime
 import sqlite3
 import os
 import uuid
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import JSONResponse
 from utils.auth import get_current_user
 
 # Use the shared database instead of a separate portfolio.db
 from utils.database import get_database
+from tools.market_data import get_market_service
 
 router = APIRouter(prefix="/api/accounts", tags=["accounts"])
 
 
 # Pydantic Models
 class AccountCreate(BaseModel):
+    model_config = ConfigDict(str_max_length=200)
+    
     name: str
     description: Optional[str] = ""
 
 
 class AccountUpdate(BaseModel):
+    model_config = ConfigDict(str_max_length=200)
+    
     name: Optional[str] = None
     description: Optional[str] = None
 
@@ -49,233 +55,226 @@ class HoldingTransfer(BaseModel):
 # No separate init_accounts_table() needed
 
 
+# Column list for tuple rows: zipping once is cheaper than dict(sqlite3.Row)
+ACCOUNT_COLUMNS = ("id", "user_id", "name", "description", "is_default", "created_at")
+_ACCOUNT_SELECT = ", ".join(ACCOUNT_COLUMNS)
+
+
 # Helper function
 def get_db():
-    """Get a database connection from the shared database"""
-    db = get_database()
-    import sqlite3
-    conn = sqlite3.connect(db.db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Borrow a pooled connection to the shared database (use as a context manager)"""
+    return get_database().pooled_connection()
 
 
-@router.get("")
-async def list_accounts(current_user: Dict = Depends(get_current_user)):
-    """List all accounts for a user"""
-    user_id = str(current_user["user_id"])
-    conn = get_db()
+def _tuple_cursor(conn):
+    """Cursor that yields plain tuples instead of sqlite3.Row"""
     cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT * FROM accounts WHERE user_id = ? ORDER BY is_default DESC, created_at ASC",
-        (user_id,)
-    )
-    rows = cursor.fetchall()
-    conn.close()
-    
-    # If no accounts, create default account
-    if not rows:
-        default_account = await create_account(
-            AccountCreate(name="我的持仓", description="默认账户"),
-            current_user=current_user
-        )
-        return [default_account]
-    
-    return [dict(row) for row in rows]
+    cursor.row_factory = None
+    return cursor
 
 
-@router.post("")
-async def create_account(account: AccountCreate, current_user: Dict = Depends(get_current_user)):
-    """Create a new account"""
-    user_id = str(current_user["user_id"])
-    conn = get_db()
-    cursor = conn.cursor()
-    
+def _begin_immediate(cursor):
+    """Take the write lock up front so multi-statement writes run as one transaction"""
+    if not cursor.connection.in_transaction:
+        cursor.execute("BEGIN IMMEDIATE")
+
+
+def _insert_account(cursor, user_id: str, name: str, description: str) -> Dict:
+    """Insert an account row; the user's first account becomes the default"""
     account_id = str(uuid.uuid4())[:8]
     created_at = datetime.now().isoformat()
     
-    # Check if this is the first account (make it default)
-    cursor.execute("SELECT COUNT(*) FROM accounts WHERE user_id = ?", (user_id,))
-    count = cursor.fetchone()[0]
-    is_default = 1 if count == 0 else 0
+    _begin_immediate(cursor)
     
+    # The first account of a user becomes the default
     cursor.execute(
         """INSERT INTO accounts (id, user_id, name, description, is_default, created_at)
-           VALUES (?, ?, ?, ?, ?, ?)""",
-        (account_id, user_id, account.name, account.description or "", is_default, created_at)
+           SELECT ?, ?, ?, ?, NOT EXISTS (SELECT 1 FROM accounts WHERE user_id = ?), ?
+           RETURNING is_default""",
+        (account_id, user_id, name, description, user_id, created_at)
     )
-    conn.commit()
-    conn.close()
+    is_default = cursor.fetchone()[0]
     
     return {
         "id": account_id,
         "user_id": user_id,
-        "name": account.name,
-        "description": account.description or "",
+        "name": name,
+        "description": description,
         "is_default": bool(is_default),
         "created_at": created_at
     }
 
 
+def _ensure_account_owned(cursor, account_id: str, user_id: str):
+    """Raise 404 unless the account exists and belongs to the user"""
+    cursor.execute("SELECT 1 FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
+    if not cursor.fetchone():
+        raise HTTPException(status_code=404, detail="Account not found")
+
+
+@router.get("")
+def list_accounts(current_user: Dict = Depends(get_current_user)):
+    """List all accounts for a user"""
+    user_id = str(current_user["user_id"])
+    with get_db() as conn:
+        cursor = _tuple_cursor(conn)
+        cursor.execute(
+            f"SELECT {_ACCOUNT_SELECT} FROM accounts WHERE user_id = ? ORDER BY is_default DESC, created_at ASC",
+            (user_id,)
+        )
+        rows = cursor.fetchall()
+        
+        # If no accounts, create default account
+        if not rows:
+            return [_insert_account(cursor, user_id, "我的持仓", "默认账户")]
+    
+    return [dict(zip(ACCOUNT_COLUMNS, row)) for row in rows]
+
+
+@router.post("")
+def create_account(account: AccountCreate, current_user: Dict = Depends(get_current_user)):
+    """Create a new account"""
+    user_id = str(current_user["user_id"])
+    with get_db() as conn:
+        return _insert_account(conn.cursor(), user_id, account.name, account.description or "")
+
+
 @router.get("/{account_id}")
-async def get_account(account_id: str, current_user: Dict = Depends(get_current_user)):
+def get_account(account_id: str, current_user: Dict = Depends(get_current_user)):
     """Get account details"""
     user_id = str(current_user["user_id"])
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
-    row = cursor.fetchone()
-    conn.close()
+    with get_db() as conn:
+        cursor = _tuple_cursor(conn)
+        cursor.execute(f"SELECT {_ACCOUNT_SELECT} FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
+        row = cursor.fetchone()
     
     if not row:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    return dict(row)
+    return dict(zip(ACCOUNT_COLUMNS, row))
 
 
 @router.put("/{account_id}")
-async def update_account(account_id: str, update: AccountUpdate, current_user: Dict = Depends(get_current_user)):
+def update_account(account_id: str, update: AccountUpdate, current_user: Dict = Depends(get_current_user)):
     """Update account details"""
     user_id = str(current_user["user_id"])
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = _tuple_cursor(conn)
+        
+        # Build update query dynamically
+        updates = []
+        values = []
+        
+        if update.name is not None:
+            updates.append("name = ?")
+            values.append(update.name)
+        if update.description is not None:
+            updates.append("description = ?")
+            values.append(update.description)
+        
+        if not updates:
+            _ensure_account_owned(cursor, account_id, user_id)
+            raise HTTPException(status_code=400, detail="No fields to update")
+        
+        values.extend((account_id, user_id))
+        
+        # The owner filter doubles as the ownership check; RETURNING saves a re-read
+        cursor.execute(
+            f"UPDATE accounts SET {', '.join(updates)} WHERE id = ? AND user_id = ? RETURNING {_ACCOUNT_SELECT}",
+            values
+        )
+        row = cursor.fetchone()
     
-    # Verify ownership
-    cursor.execute("SELECT id FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
+    if not row:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    # Build update query dynamically
-    updates = []
-    values = []
-    
-    if update.name is not None:
-        updates.append("name = ?")
-        values.append(update.name)
-    if update.description is not None:
-        updates.append("description = ?")
-        values.append(update.description)
-    
-    if not updates:
-        raise HTTPException(status_code=400, detail="No fields to update")
-    
-    values.append(account_id)
-    
-    cursor.execute(
-        f"UPDATE accounts SET {', '.join(updates)} WHERE id = ?",
-        values
-    )
-    conn.commit()
-    conn.close()
-    
-    return await get_account(account_id, current_user)
+    return dict(zip(ACCOUNT_COLUMNS, row))
 
 
 @router.delete("/{account_id}")
-async def delete_account(account_id: str, current_user: Dict = Depends(get_current_user)):
+def delete_account(account_id: str, current_user: Dict = Depends(get_current_user)):
     """Delete an account (holdings will be orphaned)"""
     user_id = str(current_user["user_id"])
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Check if it's the default account and ownership
-    cursor.execute("SELECT is_default FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
-    row = cursor.fetchone()
-    
-    if not row:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    if row["is_default"]:
-        conn.close()
-        raise HTTPException(status_code=400, detail="Cannot delete default account")
-    
-    cursor.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
-    conn.commit()
-    conn.close()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        
+        # Ownership and the default-account rule are part of the DELETE itself
+        cursor.execute(
+            "DELETE FROM accounts WHERE id = ? AND user_id = ? AND is_default = 0",
+            (account_id, user_id)
+        )
+        
+        # Slow path: tell a missing account apart from the default one
+        if cursor.rowcount == 0:
+            _ensure_account_owned(cursor, account_id, user_id)
+            raise HTTPException(status_code=400, detail="Cannot delete default account")
     
     return {"deleted": account_id}
 
 
 @router.post("/{account_id}/set-default")
-async def set_default_account(account_id: str, current_user: Dict = Depends(get_current_user)):
+def set_default_account(account_id: str, current_user: Dict = Depends(get_current_user)):
     """Set an account as the default"""
     user_id = str(current_user["user_id"])
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Verify ownership
-    cursor.execute("SELECT id FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    # Unset current default
-    cursor.execute(
-        "UPDATE accounts SET is_default = 0 WHERE user_id = ?",
-        (user_id,)
-    )
-    
-    # Set new default
-    cursor.execute(
-        "UPDATE accounts SET is_default = 1 WHERE id = ? AND user_id = ?",
-        (account_id, user_id)
-    )
-    
-    conn.commit()
-    conn.close()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        
+        # Move the default flag in one statement; the EXISTS guard doubles as the ownership check
+        cursor.execute(
+            """UPDATE accounts SET is_default = CASE WHEN id = ? THEN 1 ELSE 0 END
+               WHERE user_id = ? AND EXISTS (SELECT 1 FROM accounts WHERE id = ? AND user_id = ?)""",
+            (account_id, user_id, account_id, user_id)
+        )
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Account not found")
     
     return {"default_account": account_id}
 
 
 @router.get("/{account_id}/holdings")
-async def get_account_holdings(account_id: str, current_user: Dict = Depends(get_current_user)):
+def get_account_holdings(account_id: str, current_user: Dict = Depends(get_current_user)):
     """Get holdings for a specific account"""
     user_id = str(current_user["user_id"])
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Verify ownership
-    cursor.execute("SELECT 1 FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    cursor.execute(
-        "SELECT * FROM holdings WHERE account_id = ? AND user_id = ?",
-        (account_id, user_id)
-    )
-    rows = cursor.fetchall()
-    conn.close()
+    with get_db() as conn:
+        cursor = _tuple_cursor(conn)
+        cursor.execute(
+            """SELECT h.* FROM holdings h
+               JOIN accounts a ON a.id = h.account_id AND a.user_id = h.user_id
+               WHERE a.id = ? AND a.user_id = ?""",
+            (account_id, user_id)
+        )
+        rows = cursor.fetchall()
+        # The holdings schema differs between installs (PortfolioTool vs Database), so take names from the cursor
+        columns = [col[0] for col in cursor.description]
+        
+        # Only an empty result needs the ownership probe
+        if not rows:
+            _ensure_account_owned(cursor, account_id, user_id)
     
-    return [dict(row) for row in rows]
+    return [dict(zip(columns, row)) for row in rows]
 
 
 @router.get("/{account_id}/summary")
-async def get_account_summary(account_id: str, current_user: Dict = Depends(get_current_user)):
+def get_account_summary(account_id: str, current_user: Dict = Depends(get_current_user)):
     """Get portfolio summary for a specific account"""
-    from tools.portfolio_tools import PortfolioTool
-    from tools.market_data import get_market_service
-
     user_id = str(current_user["user_id"])
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Verify ownership
-    cursor.execute("SELECT 1 FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    # Get holdings for this account
-    cursor.execute(
-        "SELECT fund_code, fund_name, shares, cost_nav FROM holdings WHERE account_id = ? AND user_id = ?",
-        (account_id, user_id)
-    )
-    holdings = cursor.fetchall()
-    conn.close()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        
+        # Get holdings for this account
+        cursor.execute(
+            """SELECT h.fund_code, h.fund_name, h.shares, h.cost_nav, h.shares * h.cost_nav AS cost,
+                      SUM(h.shares * h.cost_nav) OVER () AS total_cost
+               FROM holdings h
+               JOIN accounts a ON a.id = h.account_id AND a.user_id = h.user_id
+               WHERE a.id = ? AND a.user_id = ?""",
+            (account_id, user_id)
+        )
+        holdings = cursor.fetchall()
+        
+        # Only an empty result needs the ownership probe
+        if not holdings:
+            _ensure_account_owned(cursor, account_id, user_id)
     
     if not holdings:
         return {
@@ -289,11 +288,13 @@ async def get_account_summary(account_id: str, current_user: Dict = Depends(get_
         }
     
     # Calculate values using market data
+    # (get_funds_nav serves from the shared NAV cache and only fetches misses upstream)
     market_service = get_market_service()
-    fund_codes = [h["fund_code"] for h in holdings]
+    fund_codes = list(dict.fromkeys(h["fund_code"] for h in holdings))
     navs = market_service.get_funds_nav(fund_codes)
     
-    total_cost = 0
+    # Cost total is aggregated by SQLite; value depends on live NAVs
+    total_cost = float(holdings[0]["total_cost"])
     total_value = 0
     holdings_data = []
     
@@ -301,7 +302,7 @@ async def get_account_summary(account_id: str, current_user: Dict = Depends(get_
         fund_code = h["fund_code"]
         shares = float(h["shares"])
         cost_nav = float(h["cost_nav"])
-        cost = shares * cost_nav
+        cost = float(h["cost"])
         
         nav = navs.get(fund_code)
         current_nav = nav.nav if nav else cost_nav
@@ -310,7 +311,6 @@ async def get_account_summary(account_id: str, current_user: Dict = Depends(get_
         profit = value - cost
         profit_rate = (profit / cost * 100) if cost > 0 else 0
         
-        total_cost += cost
         total_value += value
         
         holdings_data.append({
@@ -327,7 +327,8 @@ async def get_account_summary(account_id: str, current_user: Dict = Depends(get_
     total_profit = total_value - total_cost
     total_profit_rate = (total_profit / total_cost * 100) if total_cost > 0 else 0
     
-    return {
+    # Payload is plain floats/strings: serialize directly and skip jsonable_encoder's deep walk
+    return JSONResponse({
         "account_id": account_id,
         "holdings_count": len(holdings_data),
         "total_cost": round(total_cost, 2),
@@ -335,4 +336,4 @@ async def get_account_summary(account_id: str, current_user: Dict = Depends(get_
         "total_profit": round(total_profit, 2),
         "total_profit_rate": round(total_profit_rate, 2),
         "holdings": holdings_data
-    }
+    })
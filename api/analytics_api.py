@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
+import numpy as np
+
+from tools.market_data import get_market_service
+from tools.statistics import StatisticsTool
 
 router = APIRouter(prefix="/api/fund", tags=["analytics"])
 
@@ -25,18 +29,10 @@ class FundAnalyticsResponse(BaseModel):
     analysis: str
 
 @router.get("/{fund_code}/analytics")
-async def get_fund_analytics(fund_code: str):
+def get_fund_analytics(fund_code: str):
     """Get comprehensive analytics for a fund"""
-    from tools.fund_tools import FundDataTool
-    from tools.statistics import StatisticsTool
-    
     try:
-        # 1. Fetch History Data via FundDataTool (which uses MarketDataService)
-        # We need data to calculate metrics
-        # FundDataTool doesn't have get_history directly exposed in all versions, 
-        # but server.py uses service.get_historical_nav. 
-        # Let's use get_market_service directly for consistency with server.py
-        from tools.market_data import get_market_service
+        # 1. Fetch History Data via MarketDataService (same as server.py)
         market_service = get_market_service()
         
         # Get 1 year history for metrics
@@ -56,13 +52,11 @@ async def get_fund_analytics(fund_code: str):
             }
 
         # Extract daily returns
-        # Points are usually sorted by date? HistoryPoint has 'change_percent'
-        # Check point order. Usually API returns sorted.
+        # MarketDataService returns points sorted by date (oldest first)
         points = history.points
-        # Sort just in case
-        points.sort(key=lambda x: x.date)
         
-        returns = [(p.change_percent or 0.0) / 100.0 for p in points] # convert percent to decimal for stats
+        # convert percent to decimal for stats, as one float64 array shared by both calculations
+        returns = np.fromiter((p.change_percent or 0.0 for p in points), dtype=np.float64, count=len(points)) / 100.0
         # StatisticsTool expects decimal or percent? 
         # calculate_indicators: "0.01 for 1%" -> Decimal.
         # point.change_percent is usually e.g. 1.23 for 1.23%. 
@@ -75,7 +69,7 @@ async def get_fund_analytics(fund_code: str):
         
         # 3. Calculate Consecutive Stats
         # consecutive stats logic expects returns ordered oldest to newest?
-        # Yes, calculate_consecutive_stats iterates reversed for current, and normal for max.
+        # Yes: it splits the series into equal-sign runs; the last run is the current streak.
         # We pass PERCENTAGE values to calculate_consecutive_stats because it checks > 0 or < 0.
         # So passing decimal is fine too.
         consecutive = stats_tool.calculate_consecutive_stats(returns)
@@ -118,7 +112,7 @@ async def get_fund_analytics(fund_code: str):
 
 
 @router.get("/{fund_code}/backtest")
-async def get_fund_backtest(
+def get_fund_backtest(
     fund_code: str, 
     amount: float = 1000, 
     frequency: str = "monthly"
@@ -131,8 +125,6 @@ async def get_fund_backtest(
         amount: Investment amount per period (default 1000)
         frequency: weekly, biweekly, monthly (default monthly)
     """
-    from tools.market_data import get_market_service
-    
     try:
         market_service = get_market_service()
         
@@ -152,8 +144,7 @@ async def get_fund_backtest(
                 "message": "历史数据不足，无法进行回测"
             }
         
-        points = history.points
-        points.sort(key=lambda x: x.date)
+        points = history.points  # sorted by date, oldest first
         
         # Determine interval based on frequency
         if frequency == "weekly":
@@ -163,24 +154,25 @@ async def get_fund_backtest(
         else:  # monthly
             interval = 22  # ~22 trading days
         
-        # Simulate DIP
-        total_invested = 0.0
-        total_shares = 0.0
-        investments = []
-        
-        for i in range(0, len(points), interval):
-            point = points[i]
-            nav = point.nav
-            if nav and nav > 0:
-                shares = amount / nav
-                total_shares += shares
-                total_invested += amount
-                investments.append({
-                    "date": point.date,
-                    "nav": nav,
-                    "shares": round(shares, 4),
-                    "amount": amount
-                })
+        # Simulate DIP (vectorized over the sampled investment days)
+        navs = np.fromiter((p.nav or 0.0 for p in points), dtype=np.float64, count=len(points))
+        idx = np.arange(0, len(points), interval)
+        idx = idx[navs[idx] > 0]
+        shares = amount / navs[idx]
+        
+        total_shares = float(shares.sum())
+        total_invested = float(amount * idx.size)
+        
+        # Only the last 12 investments are returned
+        investments = [
+            {
+                "date": points[i].date,
+                "nav": points[i].nav,
+                "shares": round(float(s), 4),
+                "amount": amount
+            }
+            for i, s in zip(idx[-12:].tolist(), shares[-12:])
+        ]
         
         # Calculate final value using latest NAV
         latest_nav = points[-1].nav if points[-1].nav else 1
@@ -193,7 +185,7 @@ async def get_fund_backtest(
             "fund_code": fund_code,
             "frequency": frequency,
             "amount_per_period": amount,
-            "periods": len(investments),
+            "periods": int(idx.size),
             "total_invested": round(total_invested, 2),
             "current_value": round(current_value, 2),
             "total_shares": round(total_shares, 4),
@@ -201,9 +193,9 @@ async def get_fund_backtest(
             "latest_nav": latest_nav,
             "profit": round(profit, 2),
             "profit_rate": round(profit_rate, 2),
-            "investments": investments[-12:],  # Last 12 investments only
-            "start_date": investments[0]["date"] if investments else None,
-            "end_date": investments[-1]["date"] if investments else None
+            "investments": investments,
+            "start_date": points[idx[0]].date if idx.size else None,
+            "end_date": points[idx[-1]].date if idx.size else None
         }
         
     except Exception as e:
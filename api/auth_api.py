@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any
 
 from utils.auth import (
@@ -12,7 +12,10 @@ from utils.auth import (
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
 # Models
+# 字符串字段限长，超长请求体在校验阶段即被拒绝，不再进入 bcrypt 等昂贵逻辑
 class UserRegisterModel(BaseModel):
+    model_config = ConfigDict(str_max_length=200)
+    
     username: str
     password: str
     email: Optional[str] = None
@@ -20,10 +23,14 @@ class UserRegisterModel(BaseModel):
     invite_code: str
 
 class UserLoginModel(BaseModel):
+    model_config = ConfigDict(str_max_length=200)
+    
     username: str
     password: str
 
 class PasswordResetModel(BaseModel):
+    model_config = ConfigDict(str_max_length=200)
+    
     username: str
     new_password: str
     invite_code: str
@@ -6,17 +6,19 @@ CoinGecko 风格的板块系统：
 - Top Categories
 """
 
-from fastapi import APIRouter, Query, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Query, HTTPException, Response
 from typing import Optional, List
 
+from services.category_service import get_category_service
+
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
 
 @router.get("/")
-async def get_all_categories():
+def get_all_categories():
     """获取所有板块"""
-    from services.category_service import get_category_service
-    
     service = get_category_service()
     categories = service.get_all_categories()
     return {"categories": [c.to_dict() for c in categories]}
@@ -31,17 +33,13 @@ async def get_top_categories(limit: int = Query(10, ge=1, le=50)):
         - top_losers: 跌幅最大板块
         - most_funds: 基金最多板块
     """
-    from services.category_service import get_category_service
-    
     service = get_category_service()
     return await service.get_top_categories(limit)
 
 
 @router.get("/{slug}")
-async def get_category(slug: str):
+def get_category(slug: str):
     """获取单个板块详情"""
-    from services.category_service import get_category_service
-    
     service = get_category_service()
     category = service.get_category_by_slug(slug)
     
@@ -52,30 +50,27 @@ async def get_category(slug: str):
 
 
 @router.get("/{slug}/funds")
-async def get_category_funds(
+def get_category_funds(
     slug: str,
     limit: int = Query(50, ge=1, le=100)
 ):
     """获取板块内的基金列表"""
-    from services.category_service import get_category_service
-    
     service = get_category_service()
     funds = service.get_category_funds(slug, limit)
     return {"category": slug, "funds": funds}
 
 
 @router.get("/{slug}/index")
-async def get_category_index(slug: str):
-    """获取板块指数（实时计算）"""
-    from services.category_service import get_category_service
-    
+async def get_category_index(slug: str, response: Response):
+    """获取板块指数（优先读取后台刷新的缓存）"""
     service = get_category_service()
-    category = service.get_category_by_slug(slug)
+    category = await asyncio.to_thread(service.get_category_by_slug, slug)
     
     if not category:
         raise HTTPException(status_code=404, detail="板块不存在")
     
-    index_data = await service.calculate_category_index(category.id)
+    index_data = await service.get_category_index(category.id)
+    response.headers["Cache-Control"] = "max-age=60"
     return {
         "category": slug,
         "index": index_data
@@ -83,14 +78,12 @@ async def get_category_index(slug: str):
 
 
 @router.post("/{slug}/funds/{fund_code}")
-async def add_fund_to_category(
+def add_fund_to_category(
     slug: str,
     fund_code: str,
     weight: float = Query(1.0, ge=0.1, le=10.0)
 ):
     """将基金添加到板块"""
-    from services.category_service import get_category_service
-    
     service = get_category_service()
     service.add_fund_to_category(fund_code, slug, weight)
     return {
@@ -102,10 +95,8 @@ async def add_fund_to_category(
 
 
 @router.get("/fund/{fund_code}")
-async def get_fund_categories(fund_code: str):
+def get_fund_categories(fund_code: str):
     """获取基金所属的板块（多维度标签）"""
-    from services.category_service import get_category_service
-    
     service = get_category_service()
     categories = service.get_fund_categories(fund_code)
     return {
@@ -117,8 +108,6 @@ async def get_fund_categories(fund_code: str):
 @router.post("/refresh")
 async def refresh_all_indices():
     """刷新所有板块指数（管理员）"""
-    from services.category_service import get_category_service
-    
     service = get_category_service()
     await service.refresh_all_indices()
     return {"status": "refreshed"}
@@ -3,18 +3,114 @@
 提供专业图表所需的数据接口
 """
 
+import asyncio
+import json
+import time
+import numpy as np
+from types import MappingProxyType
 from fastapi import APIRouter, Query, HTTPException
-from typing import Optional, List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime, timedelta
+from data_ingestion.collectors import NavCollector, MetricsCollector, EventsCollector
+from data_ingestion.models import ChartDataResponse, EventType
+from tools.market_data import get_market_service
 
 router = APIRouter(prefix="/api/chart", tags=["chart"])
 
+# 时间周期 -> 天数 / 时间跨度 (模块加载时一次性构建)
+_PERIOD_DAYS = MappingProxyType({
+    "1W": 7, "1M": 30, "3M": 90, "6M": 180,
+    "1Y": 365, "3Y": 1095, "MAX": 3650
+})
+_PERIOD_DELTA = MappingProxyType({p: timedelta(days=d) for p, d in _PERIOD_DAYS.items()})
+_DEFAULT_PERIOD = "1Y"
+
+# 事件类型过滤：枚举名 (DIVIDEND) 与取值 (dividend) 均可，哈希查找
+_EVENT_TYPE_LOOKUP = MappingProxyType({
+    **{e.value: e for e in EventType},
+    **EventType.__members__
+})
+
+# 基准数据缓存 {(index_code, period): (expires_at, response)}
+# 目前为模拟数据，接入真实指数后可将 TTL 调整为 1 天
+BENCHMARK_CACHE_TTL = 60
+BENCHMARK_CACHE_SIZE = 128
+_benchmark_cache: Dict[Tuple[str, str], Tuple[float, dict]] = {}
+
+
+def _moving_averages(nav_data: List[dict], windows) -> dict:
+    """基于同一条前缀和一次性计算多条简单移动平均线 (图表格式)"""
+    navs = np.fromiter((d["value"] for d in nav_data), dtype=np.float64, count=len(nav_data))
+    csum = np.concatenate(([0.0], np.cumsum(navs)))
+    times = [d["time"] for d in nav_data]
+    
+    indicators = {}
+    for w in windows:
+        if len(navs) < w:
+            indicators[f"ma{w}"] = []
+            continue
+        ma = np.round((csum[w:] - csum[:-w]) / w, 4).tolist()
+        indicators[f"ma{w}"] = [
+            {"time": t, "value": v} for t, v in zip(times[w - 1:], ma)
+        ]
+    return indicators
+
+
+def _ndjson_chart_stream(payload: dict, batch_size: int = 512):
+    """将图表数据编码为 NDJSON 流
+
+    第一行为元数据 (series=meta，不含序列)，其后每行一个数据点，
+    series 取 nav 或指标名 (ma5/ma10/ma20)。按批输出，减少小块写入次数。
+    """
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    # 元数据中的指标可能含 datetime，沿用 FastAPI 的编码规则；数据点均为数值，直接编码
+    meta = jsonable_encoder({k: v for k, v in payload.items() if k not in ("nav_data", "indicators")})
+    yield dumps({"series": "meta", **meta}) + "\n"
+    
+    series = [("nav", payload["nav_data"])] + list(payload["indicators"].items())
+    for name, points in series:
+        for i in range(0, len(points), batch_size):
+            yield "".join(
+                dumps({"series": name, **p}) + "\n" for p in points[i:i + batch_size]
+            )
+
+
+def _downsample(points: List[dict], target: int) -> List[dict]:
+    """Largest-Triangle-Three-Buckets 降采样，保留首尾点与形态上的峰谷
+
+    横轴使用序号 (交易日近似等距)，每个桶选出与前一选中点、
+    下一桶均值构成三角形面积最大的点。
+    """
+    n = len(points)
+    if target >= n or target < 3:
+        return points
+    
+    y = np.fromiter((p["value"] for p in points), dtype=np.float64, count=n)
+    edges = np.linspace(1, n - 1, target - 1).astype(np.int64)
+    selected = [0]
+    a = 0
+    for i in range(target - 2):
+        start, end = edges[i], edges[i + 1]
+        nxt_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = (end + nxt_end - 1) / 2.0
+        avg_y = y[end:nxt_end].mean()
+        
+        xs = np.arange(start, end)
+        area = np.abs((a - avg_x) * (y[start:end] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = int(start + area.argmax())
+        selected.append(a)
+    selected.append(n - 1)
+    return [points[i] for i in selected]
+
 
 @router.get("/data/{fund_code}")
 async def get_chart_data(
     fund_code: str,
     period: str = Query("1Y", description="时间周期: 1W/1M/3M/6M/1Y/3Y/MAX"),
-    benchmark: str = Query("000300", description="对比基准代码")
+    benchmark: str = Query("000300", description="对比基准代码"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="响应格式: json / ndjson (逐点流式)")
 ):
     """获取图表数据
     
@@ -24,63 +120,44 @@ async def get_chart_data(
         - events: 事件标记
         - metrics: 量化指标
         - indicators: 技术指标
-    """
-    from data_ingestion.collectors import NavCollector, MetricsCollector, EventsCollector
-    from data_ingestion.models import ChartDataResponse
     
+    format=ndjson 时以 application/x-ndjson 流式返回，便于前端增量渲染长周期数据。
+    """
     # 计算时间范围
-    period_days = {
-        "1W": 7, "1M": 30, "3M": 90, "6M": 180,
-        "1Y": 365, "3Y": 1095, "MAX": 3650
-    }
-    days = period_days.get(period, 365)
-    start_date = datetime.now() - timedelta(days=days)
+    period_key = period if period in _PERIOD_DAYS else _DEFAULT_PERIOD
+    days = _PERIOD_DAYS[period_key]
+    start_date = datetime.now() - _PERIOD_DELTA[period_key]
     
     try:
-        # 获取净值数据
         nav_collector = NavCollector()
-        nav_data = nav_collector.get_chart_data(fund_code, period)
+        events_collector = EventsCollector()
+        metrics_collector = MetricsCollector()
+        market_service = get_market_service()
         
-        # 如果数据为空，尝试采集
-        if not nav_data:
-            nav_collector.collect(fund_code, days)
+        def load_nav_data():
             nav_data = nav_collector.get_chart_data(fund_code, period)
+            # 如果数据为空，尝试采集
+            if not nav_data:
+                nav_collector.collect(fund_code, days)
+                nav_data = nav_collector.get_chart_data(fund_code, period)
+            return nav_data
         
-        # 获取事件标记
-        events_collector = EventsCollector()
-        events = events_collector.get_chart_markers(fund_code, start_date)
-        
-        # 获取量化指标
-        metrics_collector = MetricsCollector()
-        metrics = metrics_collector.get_latest(fund_code)
+        # 净值、事件标记、量化指标、基金详情互不依赖，并发获取
+        nav_data, events, metrics, details = await asyncio.gather(
+            asyncio.to_thread(load_nav_data),
+            asyncio.to_thread(events_collector.get_chart_markers, fund_code, start_date),
+            asyncio.to_thread(metrics_collector.get_latest, fund_code),
+            asyncio.to_thread(market_service.get_fund_details, fund_code),
+        )
         metrics_dict = metrics.to_dict() if metrics else {}
         
         # 计算技术指标
-        if nav_data:
-            navs = [d['value'] for d in nav_data]
-            indicators = {
-                "ma5": metrics_collector.calculate_moving_average(navs, 5),
-                "ma10": metrics_collector.calculate_moving_average(navs, 10),
-                "ma20": metrics_collector.calculate_moving_average(navs, 20),
-            }
-            
-            # 将 MA 转换为图表格式
-            for key in indicators:
-                indicators[key] = [
-                    {"time": nav_data[i]["time"], "value": v}
-                    for i, v in enumerate(indicators[key])
-                    if v is not None
-                ]
-        else:
-            indicators = {}
+        indicators = _moving_averages(nav_data, (5, 10, 20)) if nav_data else {}
         
         # 获取基金名称
-        from tools.market_data import get_market_service
-        market_service = get_market_service()
-        details = market_service.get_fund_details(fund_code)
         fund_name = details.fund_name if details else f"基金{fund_code}"
         
-        return {
+        payload = {
             "fund_code": fund_code,
             "fund_name": fund_name,
             "period": period,
@@ -90,6 +167,9 @@ async def get_chart_data(
             "metrics": metrics_dict,
             "indicators": indicators
         }
+        if format == "ndjson":
+            return StreamingResponse(_ndjson_chart_stream(payload), media_type="application/x-ndjson")
+        return payload
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -107,31 +187,35 @@ async def get_benchmark_data(
     - 000905: 中证500
     - 000001: 上证指数
     """
-    # TODO: 实现指数数据采集
-    # 目前返回模拟数据
-    import random
+    key = (index_code, period)
+    cached = _benchmark_cache.get(key)
+    if cached and cached[0] > time.time():
+        return cached[1]
     
-    period_days = {"1W": 7, "1M": 30, "3M": 90, "6M": 180, "1Y": 365, "3Y": 1095, "MAX": 3650}
-    days = period_days.get(period, 365)
+    # TODO: 实现指数数据采集
+    # 目前返回模拟数据 (随机游走，一次性向量化生成)
+    days = _PERIOD_DAYS.get(period, _PERIOD_DAYS[_DEFAULT_PERIOD])
     
-    nav_data = []
     base_value = 1.0
-    current_value = base_value
+    changes = np.random.default_rng().normal(0.0003, 0.012, days)
+    values = np.round(base_value * np.cumprod(1.0 + changes), 4).tolist()
     
-    for i in range(days, 0, -1):
-        date = datetime.now() - timedelta(days=i)
-        change = random.gauss(0.0003, 0.012)
-        current_value *= (1 + change)
-        nav_data.append({
-            "time": int(date.timestamp()),
-            "value": round(current_value, 4)
-        })
+    now_ts = int(datetime.now().timestamp())
+    times = (now_ts - np.arange(days, 0, -1) * 86400).tolist()
     
-    return {
+    nav_data = [{"time": t, "value": v} for t, v in zip(times, values)]
+    
+    result = {
         "index_code": index_code,
         "period": period,
         "nav_data": nav_data
     }
+    
+    # 超出容量时淘汰最早写入的条目
+    if len(_benchmark_cache) >= BENCHMARK_CACHE_SIZE:
+        _benchmark_cache.pop(next(iter(_benchmark_cache)))
+    _benchmark_cache[key] = (time.time() + BENCHMARK_CACHE_TTL, result)
+    return result
 
 
 @router.get("/events/{fund_code}")
@@ -140,15 +224,12 @@ async def get_fund_events(
     event_types: Optional[List[str]] = Query(None, description="事件类型过滤")
 ):
     """获取基金事件"""
-    from data_ingestion.collectors import EventsCollector
-    from data_ingestion.models import EventType
-    
     events_collector = EventsCollector()
     
     # 转换事件类型
     types = None
     if event_types:
-        types = [EventType(t) for t in event_types if t in EventType.__members__]
+        types = [_EVENT_TYPE_LOOKUP[t] for t in event_types if t in _EVENT_TYPE_LOOKUP]
     
     events = events_collector.get_events(fund_code, event_types=types)
     
@@ -161,17 +242,15 @@ async def get_fund_events(
 @router.get("/metrics/{fund_code}")
 async def get_fund_metrics(fund_code: str):
     """获取基金量化指标"""
-    from data_ingestion.collectors import MetricsCollector, NavCollector
-    
     metrics_collector = MetricsCollector()
     metrics = metrics_collector.get_latest(fund_code)
     
     # 如果没有指标，尝试计算
     if not metrics:
         nav_collector = NavCollector()
-        history = nav_collector.get_history(fund_code, limit=365)
-        if history:
-            metrics = metrics_collector.calculate(fund_code, history)
+        navs = nav_collector.get_nav_array(fund_code, limit=365)
+        if navs.size:
+            metrics = metrics_collector.calculate_from_arrays(fund_code, navs)
             metrics_collector.save(metrics)
     
     return metrics.to_dict() if metrics else {}
@@ -180,8 +259,6 @@ async def get_fund_metrics(fund_code: str):
 @router.get("/holdings/{fund_code}")
 async def get_fund_holdings(fund_code: str):
     """获取基金持仓"""
-    from data_ingestion.collectors import EventsCollector
-    
     events_collector = EventsCollector()
     holdings = events_collector.collect_holdings(fund_code)
     
@@ -194,8 +271,6 @@ async def get_fund_holdings(fund_code: str):
 @router.post("/collect/{fund_code}")
 async def trigger_collection(fund_code: str, days: int = 365):
     """手动触发数据采集"""
-    from data_ingestion.collectors import NavCollector, EventsCollector
-    
     nav_collector = NavCollector()
     events_collector = EventsCollector()
     
@@ -216,24 +291,31 @@ async def trigger_collection(fund_code: str, days: int = 365):
 @router.get("/compare")
 async def compare_funds(
     fund_codes: List[str] = Query(..., description="基金代码列表"),
-    period: str = Query("1Y", description="时间周期")
+    period: str = Query("1Y", description="时间周期"),
+    resolution: Optional[int] = Query(None, ge=10, le=5000, description="每条净值序列的最大点数 (LTTB 降采样)")
 ):
     """多基金对比"""
-    from data_ingestion.collectors import NavCollector, MetricsCollector
-    
     nav_collector = NavCollector()
     metrics_collector = MetricsCollector()
     
-    results = []
-    for code in fund_codes[:5]:  # 最多对比5个
+    def fetch_one(code: str) -> dict:
         nav_data = nav_collector.get_chart_data(code, period)
+        if resolution:
+            nav_data = _downsample(nav_data, resolution)
         metrics = metrics_collector.get_latest(code)
-        
-        results.append({
+        return {
             "fund_code": code,
             "nav_data": nav_data,
             "metrics": metrics.to_dict() if metrics else {}
-        })
+        }
+    
+    # 各基金并发查询，总耗时取决于最慢的一只；单只失败不影响其他基金
+    codes = fund_codes[:5]  # 最多对比5个
+    fetched = await asyncio.gather(
+        *[asyncio.to_thread(fetch_one, code) for code in codes],
+        return_exceptions=True
+    )
+    results = [item for item in fetched if not isinstance(item, Exception)]
     
     return {
         "period": period,
@@ -6,11 +6,17 @@ Robinhood 风格的基金发现功能：
 - 标签发现
 """
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, BackgroundTasks, Request
 from typing import Optional, List
 
+from services.discovery_service import get_discovery_service
+from utils.http_cache import ResponseCache
+
 router = APIRouter(prefix="/api/discovery", tags=["discovery"])
 
+# 标签列表几乎不变，打标签时主动失效
+_tags_cache = ResponseCache(ttl=300)
+
 
 @router.get("/movers")
 async def get_daily_movers(limit: int = Query(10, ge=1, le=50)):
@@ -22,8 +28,6 @@ async def get_daily_movers(limit: int = Query(10, ge=1, le=50)):
         - most_popular: 热度榜
         - fund_flows: 资金流向
     """
-    from services.discovery_service import get_discovery_service
-    
     service = get_discovery_service()
     return await service.get_daily_movers(limit)
 
@@ -34,20 +38,16 @@ async def get_fund_brief(fund_code: str):
     
     返回3条简洁的涨跌原因
     """
-    from services.discovery_service import get_discovery_service
-    
     service = get_discovery_service()
     brief = await service.generate_brief(fund_code)
     return brief.to_dict()
 
 
 @router.get("/tags")
-async def get_all_tags():
-    """获取所有标签"""
-    from services.discovery_service import get_discovery_service
-    
+def get_all_tags(request: Request):
+    """获取所有标签 (进程内缓存 + ETag)"""
     service = get_discovery_service()
-    return {"tags": service.get_all_tags()}
+    return _tags_cache.respond(request, ("tags",), lambda: {"tags": service.get_all_tags()})
 
 
 @router.get("/tags/{tag_slug}/funds")
@@ -56,8 +56,6 @@ async def get_funds_by_tag(
     limit: int = Query(20, ge=1, le=100)
 ):
     """通过标签发现基金"""
-    from services.discovery_service import get_discovery_service
-    
     service = get_discovery_service()
     funds = service.get_funds_by_tag(tag_slug, limit)
     return {"tag": tag_slug, "funds": funds}
@@ -66,8 +64,6 @@ async def get_funds_by_tag(
 @router.get("/fund/{fund_code}/tags")
 async def get_fund_tags(fund_code: str):
     """获取基金的标签"""
-    from services.discovery_service import get_discovery_service
-    
     service = get_discovery_service()
     return {"fund_code": fund_code, "tags": service.get_fund_tags(fund_code)}
 
@@ -79,28 +75,25 @@ async def add_fund_tag(
     confidence: float = Query(1.0, ge=0, le=1)
 ):
     """为基金添加标签"""
-    from services.discovery_service import get_discovery_service
-    
     service = get_discovery_service()
     service.add_fund_tag(fund_code, tag_slug, confidence)
+    _tags_cache.invalidate("tags")
     return {"status": "success", "fund_code": fund_code, "tag": tag_slug}
 
 
 @router.post("/track/search/{fund_code}")
-async def track_search(fund_code: str):
-    """记录搜索热度"""
-    from services.discovery_service import get_discovery_service
-    
+async def track_search(fund_code: str, background_tasks: BackgroundTasks):
+    """记录搜索热度 (计数先入缓冲，响应后批量落库)"""
     service = get_discovery_service()
-    service.record_search(fund_code)
+    service.buffer_popularity(fund_code, "search_count")
+    background_tasks.add_task(service.flush_popularity)
     return {"status": "tracked"}
 
 
 @router.post("/track/view/{fund_code}")
-async def track_view(fund_code: str):
-    """记录浏览热度"""
-    from services.discovery_service import get_discovery_service
-    
+async def track_view(fund_code: str, background_tasks: BackgroundTasks):
+    """记录浏览热度 (计数先入缓冲，响应后批量落库)"""
     service = get_discovery_service()
-    service.record_view(fund_code)
+    service.buffer_popularity(fund_code, "view_count")
+    background_tasks.add_task(service.flush_popularity)
     return {"status": "tracked"}
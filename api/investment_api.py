@@ -13,25 +13,11 @@ from typing import Optional, List, Dict
 router = APIRouter(prefix="/api/investment", tags=["investment"])
 
 from utils.auth import get_current_user
+from services.investment_service import get_investment_service, PlanNotFoundError
 
 
-def _assert_plan_ownership(plan_id: int, user_id: int):
-    """Ensure plan belongs to current user"""
-    from services.investment_service import get_investment_service
-    import sqlite3
-
-    service = get_investment_service()
-    conn = sqlite3.connect(service.db_path)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id FROM investment_plans WHERE id = ? AND user_id = ?",
-        (plan_id, user_id)
-    )
-    row = cursor.fetchone()
-    conn.close()
-
-    if not row:
-        raise HTTPException(status_code=404, detail="投资计划不存在")
+def _plan_not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="投资计划不存在")
 
 
 # ============ 请求模型 ============
@@ -54,7 +40,7 @@ class BargainAlertRequest(BaseModel):
 # ============ 微指令流 API ============
 
 @router.post("/flow/start")
-async def start_investment_flow(
+def start_investment_flow(
     fund_code: str,
     current_user: Dict = Depends(get_current_user)
 ):
@@ -62,8 +48,6 @@ async def start_investment_flow(
     
     返回 session_id 用于后续步骤
     """
-    from services.investment_service import get_investment_service
-    
     try:
         service = get_investment_service()
         user_id = int(current_user["user_id"])
@@ -80,10 +64,8 @@ async def start_investment_flow(
 
 
 @router.post("/flow/calculate")
-async def calculate_investment(request: FlowCalculateRequest):
+def calculate_investment(request: FlowCalculateRequest):
     """微指令流 - 步骤2：计算预估份额"""
-    from services.investment_service import get_investment_service
-    
     try:
         service = get_investment_service()
         state = service.calculate_flow(
@@ -106,13 +88,11 @@ async def calculate_investment(request: FlowCalculateRequest):
 
 
 @router.post("/flow/confirm")
-async def confirm_investment(request: PlanCreateRequest):
+def confirm_investment(request: PlanCreateRequest):
     """微指令流 - 步骤3：确认提交
     
     创建定投计划
     """
-    from services.investment_service import get_investment_service
-    
     try:
         service = get_investment_service()
         plan = service.confirm_flow(request.session_id)
@@ -130,10 +110,8 @@ async def confirm_investment(request: PlanCreateRequest):
 # ============ 计划管理 API ============
 
 @router.get("/plans")
-async def get_user_plans(current_user: Dict = Depends(get_current_user)):
+def get_user_plans(current_user: Dict = Depends(get_current_user)):
     """获取用户的定投计划列表"""
-    from services.investment_service import get_investment_service
-    
     service = get_investment_service()
     user_id = int(current_user["user_id"])
     plans = service.get_user_plans(user_id)
@@ -141,48 +119,46 @@ async def get_user_plans(current_user: Dict = Depends(get_current_user)):
 
 
 @router.post("/plans/{plan_id}/pause")
-async def pause_plan(plan_id: int, current_user: Dict = Depends(get_current_user)):
+def pause_plan(plan_id: int, current_user: Dict = Depends(get_current_user)):
     """暂停定投计划"""
-    from services.investment_service import get_investment_service
-    
     service = get_investment_service()
-    _assert_plan_ownership(plan_id, int(current_user["user_id"]))
-    service.pause_plan(plan_id)
+    try:
+        service.pause_plan(plan_id, int(current_user["user_id"]))
+    except PlanNotFoundError:
+        raise _plan_not_found()
     return {"status": "paused", "plan_id": plan_id}
 
 
 @router.post("/plans/{plan_id}/resume")
-async def resume_plan(plan_id: int, current_user: Dict = Depends(get_current_user)):
+def resume_plan(plan_id: int, current_user: Dict = Depends(get_current_user)):
     """恢复定投计划"""
-    from services.investment_service import get_investment_service
-    
     service = get_investment_service()
-    _assert_plan_ownership(plan_id, int(current_user["user_id"]))
-    service.resume_plan(plan_id)
+    try:
+        service.resume_plan(plan_id, int(current_user["user_id"]))
+    except PlanNotFoundError:
+        raise _plan_not_found()
     return {"status": "resumed", "plan_id": plan_id}
 
 
 @router.post("/plans/{plan_id}/cancel")
-async def cancel_plan(plan_id: int, current_user: Dict = Depends(get_current_user)):
+def cancel_plan(plan_id: int, current_user: Dict = Depends(get_current_user)):
     """取消定投计划"""
-    from services.investment_service import get_investment_service
-    
     service = get_investment_service()
-    _assert_plan_ownership(plan_id, int(current_user["user_id"]))
-    service.cancel_plan(plan_id)
+    try:
+        service.cancel_plan(plan_id, int(current_user["user_id"]))
+    except PlanNotFoundError:
+        raise _plan_not_found()
     return {"status": "cancelled", "plan_id": plan_id}
 
 
 # ============ 智能预警 API ============
 
 @router.get("/alerts")
-async def get_alerts(
+def get_alerts(
     unread_only: bool = Query(False),
     current_user: Dict = Depends(get_current_user)
 ):
     """获取预警列表"""
-    from services.investment_service import get_investment_service
-    
     service = get_investment_service()
     user_id = int(current_user["user_id"])
     alerts = service.get_alerts(user_id, unread_only)
@@ -190,25 +166,17 @@ async def get_alerts(
 
 
 @router.post("/plans/{plan_id}/bargain-alert")
-async def set_bargain_alert(
+def set_bargain_alert(
     plan_id: int,
     bargain_nav: float = Query(..., gt=0, description="捡漏区间净值"),
     current_user: Dict = Depends(get_current_user)
 ):
     """设置捡漏区间预警"""
-    from services.investment_service import get_investment_service
-    
     service = get_investment_service()
-    _assert_plan_ownership(plan_id, int(current_user["user_id"]))
-    
-    conn = __import__('sqlite3').connect(service.db_path)
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE investment_plans SET bargain_nav = ? WHERE id = ?",
-        (bargain_nav, plan_id)
-    )
-    conn.commit()
-    conn.close()
+    try:
+        service.set_bargain_nav(plan_id, int(current_user["user_id"]), bargain_nav)
+    except PlanNotFoundError:
+        raise _plan_not_found()
     
     return {
         "status": "set",
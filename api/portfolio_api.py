@@ -6,14 +6,37 @@
 - 成就系统
 """
 
+import asyncio
 from fastapi import APIRouter, Query, HTTPException, Depends
 from typing import Optional, List, Dict
-import json
+from types import MappingProxyType
 from pydantic import BaseModel
 from utils.auth import get_current_user
+from services.portfolio_service import get_portfolio_service
+from tools.portfolio_tools import PortfolioTool
 
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
 
+# 单例：PortfolioTool 每次操作都使用独立的短连接，可在请求间安全共享
+_portfolio_tool = None
+
+
+def _get_portfolio_tool():
+    global _portfolio_tool
+    if _portfolio_tool is None:
+        _portfolio_tool = PortfolioTool()
+    return _portfolio_tool
+
+# 增长曲线周期 -> 天数
+_GROWTH_PERIOD_DAYS = MappingProxyType({
+    "1W": 7,
+    "1M": 30,
+    "3M": 90,
+    "6M": 180,
+    "1Y": 365,
+    "ALL": 3650
+})
+
 
 @router.get("/summary")
 async def get_portfolio_summary(current_user: Dict = Depends(get_current_user)):
@@ -26,7 +49,6 @@ async def get_portfolio_summary(current_user: Dict = Depends(get_current_user)):
     - sparkline_24h: 24小时趋势线
     """
     user_id = current_user["user_id"]
-    from services.portfolio_service import get_portfolio_service
     
     service = get_portfolio_service()
     summary = await service.get_summary(user_id)
@@ -43,7 +65,6 @@ async def get_portfolio_snapshots(
     用于渲染资产增长曲线
     """
     user_id = current_user["user_id"]
-    from services.portfolio_service import get_portfolio_service
     
     service = get_portfolio_service()
     snapshots = service.get_snapshots(user_id, days)
@@ -58,7 +79,6 @@ async def get_portfolio_snapshots(
 async def create_snapshot(current_user: Dict = Depends(get_current_user)):
     """手动生成资产快照"""
     user_id = current_user["user_id"]
-    from services.portfolio_service import get_portfolio_service
     
     service = get_portfolio_service()
     snapshot = await service.generate_snapshot(user_id)
@@ -69,11 +89,11 @@ async def create_snapshot(current_user: Dict = Depends(get_current_user)):
 async def get_achievements(current_user: Dict = Depends(get_current_user)):
     """获取用户成就列表"""
     user_id = current_user["user_id"]
-    from services.portfolio_service import get_portfolio_service
     
     service = get_portfolio_service()
-    achievements = service.get_achievements(user_id)
-    pending = service.get_pending_achievements(user_id)
+    # 已获得与未完成成就共用同一次查询
+    achievements = await asyncio.to_thread(service.get_achievements, user_id)
+    pending = service.get_pending_achievements(user_id, achievements)
     
     return {
         "earned": [a.to_dict() for a in achievements],
@@ -90,7 +110,6 @@ async def get_recent_achievements(
 ):
     """获取最近获得的成就"""
     user_id = current_user["user_id"]
-    from services.portfolio_service import get_portfolio_service
     
     service = get_portfolio_service()
     achievements = service.get_achievements(user_id)[:limit]
@@ -107,31 +126,11 @@ async def get_growth_curve(
     period: 1W, 1M, 3M, 6M, 1Y, ALL
     """
     user_id = current_user["user_id"]
-    from services.portfolio_service import get_portfolio_service
     
-    period_days = {
-        "1W": 7,
-        "1M": 30,
-        "3M": 90,
-        "6M": 180,
-        "1Y": 365,
-        "ALL": 3650
-    }
-    
-    days = period_days.get(period, 30)
+    days = _GROWTH_PERIOD_DAYS.get(period, 30)
     
     service = get_portfolio_service()
-    snapshots = service.get_snapshots(user_id, days)
-    
-    # 转换为图表数据格式
-    chart_data = [
-        {
-            "time": s.date.strftime("%Y-%m-%d"),
-            "value": s.total_value,
-            "profit": s.total_profit
-        }
-        for s in snapshots
-    ]
+    chart_data = service.get_growth_curve(user_id, days)
     
     return {
         "period": period,
@@ -151,13 +150,10 @@ async def update_holding_tags(
 ):
     """更新持仓标签"""
     user_id = current_user["user_id"]
-    from tools.portfolio_tools import PortfolioTool
-    
     # 使用 PortfolioTool 更新标签
     # 注意：PortoflioTool 独立管理数据库连接
-    tool = PortfolioTool()
-    result_json = tool.update_tags(code, tag_update.tags, user_id=user_id)
-    result = json.loads(result_json)
+    tool = _get_portfolio_tool()
+    result = tool.update_tags_data(code, tag_update.tags, user_id=user_id)
     
 
     if result.get("状态") == "成功":
@@ -178,58 +174,49 @@ class HoldingAdd(BaseModel):
 @router.get("/valuation")
 async def get_valuation(current_user: Dict = Depends(get_current_user)):
     """获取持仓估值"""
-    from tools.portfolio_tools import PortfolioTool
     print(f"DEBUG: Processing valuation for user {current_user['user_id']}")
-    tool = PortfolioTool()
-    result = tool.calculate_valuation(user_id=current_user["user_id"])
-    return json.loads(result)
+    tool = _get_portfolio_tool()
+    return tool.get_valuation_data(user_id=current_user["user_id"])
 
 
 @router.get("/holdings")
 async def list_holdings(current_user: Dict = Depends(get_current_user)):
     """获取持仓列表"""
-    from tools.portfolio_tools import PortfolioTool
-    tool = PortfolioTool()
-    result = tool.list_holdings(user_id=current_user["user_id"])
-    return json.loads(result)
+    tool = _get_portfolio_tool()
+    return tool.get_holdings_data(user_id=current_user["user_id"])
 
 
 @router.post("/holdings")
 async def add_holding(holding: HoldingAdd, current_user: Dict = Depends(get_current_user)):
     """添加持仓"""
-    from tools.portfolio_tools import PortfolioTool
-    tool = PortfolioTool()
-    result = tool.add_holding(
+    tool = _get_portfolio_tool()
+    return tool.add_holding_data(
         holding.fund_code,
         holding.fund_name or holding.fund_code,
         holding.shares,
         holding.cost_nav,
         user_id=current_user["user_id"]
     )
-    return json.loads(result)
 
 
 @router.delete("/holdings/{fund_code}")
 async def remove_holding(fund_code: str, current_user: Dict = Depends(get_current_user)):
     """删除持仓"""
-    from tools.portfolio_tools import PortfolioTool
     print(f"DEBUG: Deleting holding {fund_code} for user {current_user['user_id']}")
-    tool = PortfolioTool()
-    result = tool.remove_holding(fund_code, user_id=current_user["user_id"])
+    tool = _get_portfolio_tool()
+    result = tool.remove_holding_data(fund_code, user_id=current_user["user_id"])
     print(f"DEBUG: Deletion result: {result}")
-    return json.loads(result)
+    return result
 
 
 @router.post("/holdings/batch")
 async def batch_add_holdings(holdings: List[HoldingAdd], current_user: Dict = Depends(get_current_user)):
     """批量添加持仓"""
-    from tools.portfolio_tools import PortfolioTool
-    tool = PortfolioTool()
+    tool = _get_portfolio_tool()
     
     # Check limit to prevent abuse
     if len(holdings) > 100:
         raise HTTPException(status_code=400, detail="单次导入不能超过100条")
         
     holdings_dict = [h.dict() for h in holdings]
-    result_json = tool.batch_add_holdings(holdings_dict, user_id=current_user["user_id"])
-    return json.loads(result_json)
+    return tool.batch_add_holdings_data(holdings_dict, user_id=current_user["user_id"])
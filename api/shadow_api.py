@@ -7,12 +7,21 @@
 - 排行榜
 """
 
-from fastapi import APIRouter, Query, HTTPException, Depends
+from fastapi import APIRouter, Query, HTTPException, Depends, Request
 from pydantic import BaseModel
 from typing import Optional, List
 
+from utils.database import get_connection_pool
+from services.shadow_tracker_service import get_shadow_service, HoldingExtractor
+from agents.shadow_analyst import ShadowAnalystWrapper
+from utils.http_cache import ResponseCache
+
 router = APIRouter(prefix="/api/shadow", tags=["shadow"])
 
+# 博主列表随增删失效；排行榜按小时级更新，允许浏览器缓存
+_bloggers_cache = ResponseCache(ttl=300)
+_ranking_cache = ResponseCache(ttl=300, client_max_age=300)
+
 
 def get_current_user_id():
     return 1
@@ -34,10 +43,8 @@ class ExtractHoldingsRequest(BaseModel):
 # ============ 博主管理 ============
 
 @router.post("/track")
-async def add_blogger_to_track(request: AddBloggerRequest):
+def add_blogger_to_track(request: AddBloggerRequest):
     """添加追踪博主"""
-    from services.shadow_tracker_service import get_shadow_service
-    
     service = get_shadow_service()
     blogger_id = service.add_blogger(
         platform=request.platform,
@@ -45,6 +52,8 @@ async def add_blogger_to_track(request: AddBloggerRequest):
         name=request.name,
         description=request.description
     )
+    _bloggers_cache.invalidate("bloggers")
+    _ranking_cache.invalidate("ranking")
     
     return {
         "status": "tracking",
@@ -54,20 +63,19 @@ async def add_blogger_to_track(request: AddBloggerRequest):
 
 
 @router.get("/bloggers")
-async def list_bloggers(active_only: bool = Query(True)):
-    """列出追踪的博主"""
-    from services.shadow_tracker_service import get_shadow_service
-    
+def list_bloggers(request: Request, active_only: bool = Query(True)):
+    """列出追踪的博主 (进程内缓存 + ETag)"""
     service = get_shadow_service()
-    bloggers = service.list_bloggers(active_only)
-    return {"bloggers": [b.to_dict() for b in bloggers]}
+    return _bloggers_cache.respond(
+        request,
+        ("bloggers", active_only),
+        lambda: {"bloggers": [b.to_dict() for b in service.list_bloggers(active_only)]}
+    )
 
 
 @router.get("/bloggers/{blogger_id}")
-async def get_blogger(blogger_id: int):
+def get_blogger(blogger_id: int):
     """获取博主详情"""
-    from services.shadow_tracker_service import get_shadow_service
-    
     service = get_shadow_service()
     blogger = service.get_blogger(blogger_id)
     
@@ -78,20 +86,16 @@ async def get_blogger(blogger_id: int):
 
 
 @router.delete("/bloggers/{blogger_id}")
-async def stop_tracking(blogger_id: int):
+def stop_tracking(blogger_id: int):
     """停止追踪博主"""
-    from services.shadow_tracker_service import get_shadow_service
-    import sqlite3
-    
     service = get_shadow_service()
-    conn = sqlite3.connect(service.db_path)
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE bloggers SET is_active = 0 WHERE id = ?",
-        (blogger_id,)
-    )
-    conn.commit()
-    conn.close()
+    with get_connection_pool(service.db_path).connection() as conn:
+        conn.execute(
+            "UPDATE bloggers SET is_active = 0 WHERE id = ?",
+            (blogger_id,)
+        )
+    _bloggers_cache.invalidate("bloggers")
+    _ranking_cache.invalidate("ranking")
     
     return {"status": "stopped", "blogger_id": blogger_id}
 
@@ -99,10 +103,8 @@ async def stop_tracking(blogger_id: int):
 # ============ 持仓获取 ============
 
 @router.get("/{blogger_id}/portfolio")
-async def get_blogger_portfolio(blogger_id: int):
+def get_blogger_portfolio(blogger_id: int):
     """获取博主影子组合"""
-    from services.shadow_tracker_service import get_shadow_service
-    
     service = get_shadow_service()
     portfolio = service.build_shadow_portfolio(blogger_id)
     return portfolio.to_dict()
@@ -111,8 +113,6 @@ async def get_blogger_portfolio(blogger_id: int):
 @router.post("/{blogger_id}/fetch")
 async def fetch_latest_holdings(blogger_id: int):
     """抓取博主最新持仓"""
-    from services.shadow_tracker_service import get_shadow_service
-    
     service = get_shadow_service()
     holdings = await service.fetch_and_extract(blogger_id)
     
@@ -125,10 +125,8 @@ async def fetch_latest_holdings(blogger_id: int):
 
 
 @router.post("/extract")
-async def extract_holdings_from_text(request: ExtractHoldingsRequest):
+def extract_holdings_from_text(request: ExtractHoldingsRequest):
     """从文本中提取持仓信息（LLM）"""
-    from services.shadow_tracker_service import HoldingExtractor
-    
     extractor = HoldingExtractor()
     holdings = extractor.extract_from_text(request.text)
     
@@ -146,8 +144,6 @@ async def get_blogger_performance(
     period: str = Query("3M", pattern="^(1M|3M|6M|1Y)$")
 ):
     """获取博主业绩归因分析"""
-    from services.shadow_tracker_service import get_shadow_service
-    
     service = get_shadow_service()
     metrics = await service.analyze_performance(blogger_id, period)
     
@@ -159,10 +155,8 @@ async def get_blogger_performance(
 
 
 @router.get("/{blogger_id}/evaluate")
-async def evaluate_blogger(blogger_id: int):
+def evaluate_blogger(blogger_id: int):
     """评估博主是否值得跟投"""
-    from agents.shadow_analyst import ShadowAnalystWrapper
-    
     analyst = ShadowAnalystWrapper()
     evaluation = analyst.should_follow(blogger_id)
     
@@ -172,42 +166,41 @@ async def evaluate_blogger(blogger_id: int):
 # ============ 排行榜 ============
 
 @router.get("/ranking")
-async def get_blogger_ranking(
+def get_blogger_ranking(
+    request: Request,
     period: str = Query("3M", pattern="^(1M|3M|6M|1Y)$"),
     sort_by: str = Query("alpha", pattern="^(alpha|total_return|sharpe_ratio|win_rate)$"),
     limit: int = Query(20, ge=1, le=100)
 ):
-    """获取博主排行榜"""
-    from services.shadow_tracker_service import get_shadow_service
-    
+    """获取博主排行榜 (进程内缓存 + ETag)"""
     service = get_shadow_service()
-    ranking = service.get_blogger_ranking(period, sort_by, limit)
-    
-    return {
-        "period": period,
-        "sort_by": sort_by,
-        "ranking": ranking
-    }
+    return _ranking_cache.respond(
+        request,
+        ("ranking", period, sort_by, limit),
+        lambda: {
+            "period": period,
+            "sort_by": sort_by,
+            "ranking": service.get_blogger_ranking(period, sort_by, limit)
+        }
+    )
 
 
 @router.get("/top-picks")
-async def get_top_picks(limit: int = Query(5, ge=1, le=20)):
+def get_top_picks(limit: int = Query(5, ge=1, le=20)):
     """获取最值得关注的博主"""
-    from services.shadow_tracker_service import get_shadow_service
-    
     service = get_shadow_service()
     
-    # 综合 alpha 和 sharpe 排序
-    ranking = service.get_blogger_ranking("3M", "alpha", limit)
-    
-    top_picks = []
-    for r in ranking:
-        if r.get("alpha", 0) and r["alpha"] > 0:
-            top_picks.append({
-                "blogger_id": r["blogger_id"],
-                "name": r["name"],
-                "alpha": r["alpha"],
-                "recommendation": "可以参考" if r["alpha"] > 5 else "谨慎判断"
-            })
+    # 综合 alpha 和 sharpe 排序，alpha > 0 的过滤下推到 SQL
+    ranking = service.get_blogger_ranking("3M", "alpha", limit, min_alpha=0.0)
+    
+    top_picks = [
+        {
+            "blogger_id": r["blogger_id"],
+            "name": r["name"],
+            "alpha": r["alpha"],
+            "recommendation": "可以参考" if r["alpha"] > 5 else "谨慎判断"
+        }
+        for r in ranking
+    ]
     
     return {"top_picks": top_picks}
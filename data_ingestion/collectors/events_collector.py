@@ -9,71 +9,103 @@
 
 import json
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 import logging
-import sqlite3
 import os
 import re
 
+try:
+    import akshare as _ak
+except ImportError:
+    _ak = None
+
+from utils.database import get_connection_pool
 from ..models import FundEvent, EventType, FundHolding
 
 logger = logging.getLogger(__name__)
 
+# 批量采集时的最大并发线程数
+MAX_WORKERS = 8
+
+# 数据源无数据时是否生成模拟数据（仅开发环境使用）
+ENABLE_MOCK_DATA = os.getenv("ENABLE_MOCK_DATA", "false").lower() == "true"
+
+
+def _column(df, name: str, default) -> list:
+    """按列整体取出 DataFrame 的值，列不存在时以默认值填充 (替代逐行 iterrows)"""
+    if name in df.columns:
+        return df[name].tolist()
+    return [default] * len(df)
+
+
+def _event_row(event: FundEvent) -> tuple:
+    """将事件转换为 fund_events 的插入参数 (空元数据不经过 json.dumps)"""
+    return (
+        event.fund_code,
+        event.date.strftime("%Y-%m-%d"),
+        event.event_type.value,
+        event.title,
+        event.description,
+        event.value,
+        json.dumps(event.metadata) if event.metadata else "{}"
+    )
+
 
 class EventsCollector:
     """事件采集器"""
     
-    def __init__(self, db_path: str = "./data/fund_history.db"):
+    def __init__(self, db_path: str = "./data/fund_history.db", enable_mock: bool = ENABLE_MOCK_DATA):
         self.db_path = db_path
+        self._enable_mock = enable_mock
+        self._pool = get_connection_pool(db_path)
         self._ensure_db()
-        self._akshare = None
-        try:
-            import akshare as ak
-            self._akshare = ak
-        except ImportError:
-            pass
+        self._akshare = _ak
     
     def _ensure_db(self):
         """确保数据库表存在"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 事件表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS fund_events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                fund_code TEXT NOT NULL,
-                date TEXT NOT NULL,
-                event_type TEXT NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                value REAL,
-                metadata TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(fund_code, date, event_type, title)
-            )
-        """)
-        
-        # 持仓表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS fund_holdings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                fund_code TEXT NOT NULL,
-                date TEXT NOT NULL,
-                stock_code TEXT NOT NULL,
-                stock_name TEXT,
-                weight REAL,
-                shares REAL,
-                market_value REAL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(fund_code, date, stock_code)
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        with self._pool.connection() as conn:
+            cursor = conn.cursor()
+        
+            # 事件表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS fund_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fund_code TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    value REAL,
+                    metadata TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(fund_code, date, event_type, title)
+                )
+            """)
+        
+            # 持仓表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS fund_holdings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fund_code TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    stock_code TEXT NOT NULL,
+                    stock_name TEXT,
+                    weight REAL,
+                    shares REAL,
+                    market_value REAL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(fund_code, date, stock_code)
+                )
+            """)
+        
+            # 创建索引
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_events_fund_date 
+                ON fund_events(fund_code, date DESC)
+            """)
     
     def collect(self, fund_code: str) -> List[FundEvent]:
         """采集基金事件
@@ -108,19 +140,23 @@ class EventsCollector:
                     indicator="分红送配"
                 )
                 if df is not None and len(df) > 0:
-                    for _, row in df.iterrows():
+                    for record_date, dividend, pay_date in zip(
+                        _column(df, '权益登记日', ''),
+                        _column(df, '每份分红', 0),
+                        _column(df, '分红发放日', '')
+                    ):
                         try:
-                            date_str = str(row.get('权益登记日', '')).strip()
+                            date_str = str(record_date).strip()
                             if not date_str or date_str == 'nan':
                                 continue
                             
                             event = FundEvent(
                                 fund_code=fund_code,
-                                date=datetime.strptime(date_str, "%Y-%m-%d"),
+                                date=datetime.fromisoformat(date_str),
                                 event_type=EventType.DIVIDEND,
-                                title=f"每份分红 {row.get('每份分红', 0)} 元",
-                                description=str(row.get('分红发放日', '')),
-                                value=float(row.get('每份分红', 0))
+                                title=f"每份分红 {dividend} 元",
+                                description=str(pay_date),
+                                value=float(dividend)
                             )
                             events.append(event)
                         except Exception as e:
@@ -128,8 +164,8 @@ class EventsCollector:
             except Exception as e:
                 logger.warning(f"采集分红失败: {e}")
         
-        # 如果没有数据，生成模拟数据
-        if not events:
+        # 如果没有数据且允许模拟，生成模拟数据
+        if not events and self._enable_mock:
             events = self._generate_mock_dividends(fund_code)
         
         return events
@@ -171,16 +207,23 @@ class EventsCollector:
                     date=datetime.now().strftime("%Y")
                 )
                 if df is not None and len(df) > 0:
-                    for _, row in df.iterrows():
+                    now = datetime.now()
+                    for stock_code, stock_name, weight, shares, market_value in zip(
+                        _column(df, '股票代码', ''),
+                        _column(df, '股票名称', ''),
+                        _column(df, '占净值比例', 0),
+                        _column(df, '持股数', None),
+                        _column(df, '持仓市值', None)
+                    ):
                         try:
                             holding = FundHolding(
                                 fund_code=fund_code,
-                                date=datetime.now(),
-                                stock_code=str(row.get('股票代码', '')),
-                                stock_name=str(row.get('股票名称', '')),
-                                weight=float(row.get('占净值比例', 0)),
-                                shares=float(row.get('持股数', 0)) if row.get('持股数') else 0,
-                                market_value=float(row.get('持仓市值', 0)) if row.get('持仓市值') else 0
+                                date=now,
+                                stock_code=str(stock_code),
+                                stock_name=str(stock_name),
+                                weight=float(weight),
+                                shares=float(shares) if shares else 0,
+                                market_value=float(market_value) if market_value else 0
                             )
                             holdings.append(holding)
                         except Exception as e:
@@ -188,8 +231,8 @@ class EventsCollector:
             except Exception as e:
                 logger.warning(f"采集持仓失败: {e}")
         
-        # 如果没有数据，生成模拟数据
-        if not holdings:
+        # 如果没有数据且允许模拟，生成模拟数据
+        if not holdings and self._enable_mock:
             holdings = self._generate_mock_holdings(fund_code)
         
         return holdings
@@ -227,66 +270,63 @@ class EventsCollector:
         
         nav_collector = NavCollector()
         codes = fund_codes or nav_collector.DEFAULT_FUNDS
-        all_holdings = []
         
-        for code in codes:
+        def _collect_one(code: str) -> List[FundHolding]:
             try:
                 holdings = self.collect_holdings(code)
                 self.save_holdings(holdings)
-                all_holdings.extend(holdings)
+                return holdings
             except Exception as e:
                 logger.error(f"采集 {code} 持仓失败: {e}")
+                return []
+        
+        # 各基金的网络请求相互独立，线程池并发采集 (结果保持原顺序)
+        all_holdings = []
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(codes)))) as executor:
+            for holdings in executor.map(_collect_one, codes):
+                all_holdings.extend(holdings)
+        
+        # 批量写入后按需刷新查询规划器统计信息
+        with self._pool.connection() as conn:
+            conn.execute("PRAGMA optimize")
         
         return all_holdings
     
     def save_events(self, events: List[FundEvent]):
-        """保存事件到数据库"""
+        """保存事件到数据库 (单事务 executemany)"""
         if not events:
             return
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for event in events:
-            try:
-                date_str = event.date.strftime("%Y-%m-%d")
-                cursor.execute("""
-                    INSERT OR IGNORE INTO fund_events 
-                    (fund_code, date, event_type, title, description, value, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    event.fund_code,
-                    date_str,
-                    event.event_type.value,
-                    event.title,
-                    event.description,
-                    event.value,
-                    json.dumps(event.metadata)
-                ))
-            except Exception as e:
-                logger.warning(f"保存事件失败: {e}")
-        
-        conn.commit()
-        conn.close()
+        try:
+            rows = [_event_row(event) for event in events]
+        except Exception:
+            # 存在无法转换的事件时逐条转换，跳过出错的事件
+            rows = []
+            for event in events:
+                try:
+                    rows.append(_event_row(event))
+                except Exception as e:
+                    logger.warning(f"保存事件失败: {e}")
+        
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("""
+                INSERT OR IGNORE INTO fund_events 
+                (fund_code, date, event_type, title, description, value, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
     
     def save_holdings(self, holdings: List[FundHolding]):
-        """保存持仓到数据库"""
+        """保存持仓到数据库 (单事务 executemany)"""
         if not holdings:
             return
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        rows = []
         for holding in holdings:
             try:
-                date_str = holding.date.strftime("%Y-%m-%d")
-                cursor.execute("""
-                    INSERT OR REPLACE INTO fund_holdings 
-                    (fund_code, date, stock_code, stock_name, weight, shares, market_value)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
+                rows.append((
                     holding.fund_code,
-                    date_str,
+                    holding.date.strftime("%Y-%m-%d"),
                     holding.stock_code,
                     holding.stock_name,
                     holding.weight,
@@ -296,8 +336,18 @@ class EventsCollector:
             except Exception as e:
                 logger.warning(f"保存持仓失败: {e}")
         
-        conn.commit()
-        conn.close()
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("""
+                INSERT INTO fund_holdings 
+                (fund_code, date, stock_code, stock_name, weight, shares, market_value)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(fund_code, date, stock_code) DO UPDATE SET
+                    stock_name = excluded.stock_name,
+                    weight = excluded.weight,
+                    shares = excluded.shares,
+                    market_value = excluded.market_value
+            """, rows)
     
     def get_events(
         self, 
@@ -306,10 +356,10 @@ class EventsCollector:
         event_types: List[EventType] = None
     ) -> List[FundEvent]:
         """获取事件列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM fund_events WHERE fund_code = ?"
+        query = """
+            SELECT fund_code, date, event_type, title, description, value, metadata
+            FROM fund_events WHERE fund_code = ?
+        """
         params = [fund_code]
         
         if start_date:
@@ -323,20 +373,19 @@ class EventsCollector:
         
         query += " ORDER BY date DESC"
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
         
         events = []
         for row in rows:
             events.append(FundEvent(
-                fund_code=row[1],
-                date=datetime.strptime(row[2], "%Y-%m-%d"),
-                event_type=EventType(row[3]),
-                title=row[4],
-                description=row[5] or "",
-                value=row[6] or 0,
-                metadata=json.loads(row[7]) if row[7] else {}
+                fund_code=row["fund_code"],
+                date=datetime.fromisoformat(row["date"]),
+                event_type=EventType(row["event_type"]),
+                title=row["title"],
+                description=row["description"] or "",
+                value=row["value"] or 0,
+                metadata=json.loads(row["metadata"]) if row["metadata"] else {}
             ))
         
         return events
@@ -8,16 +8,59 @@
 """
 
 import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence
 import logging
-import sqlite3
 import os
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.database import get_connection_pool
 from ..models import FundMetrics, FundNavHistory
 
 logger = logging.getLogger(__name__)
 
+# 批量更新时的最大并发线程数
+MAX_WORKERS = 8
+
+# 区间收益率对应的交易日数
+_PERIOD_DAYS = {"1m": 22, "3m": 66, "6m": 132, "1y": 252, "3y": 756}
+
+# 在 SQLite 内用窗口函数一次算出日收益率统计、最大回撤和区间起点净值
+# rn=1 为最新一天；区间起点取倒数第 days+1 天，数据不足 days+1 天时取最早一天
+_SQL_METRICS = """
+    WITH h AS (
+        SELECT date, nav FROM fund_nav_history
+        WHERE fund_code = ? ORDER BY date DESC LIMIT ?
+    ), w AS (
+        SELECT nav,
+               ROW_NUMBER() OVER (ORDER BY date DESC) AS rn,
+               COUNT(*) OVER () AS cnt,
+               (nav - LAG(nav) OVER (ORDER BY date)) / LAG(nav) OVER (ORDER BY date) AS r,
+               MAX(nav) OVER (ORDER BY date ROWS UNBOUNDED PRECEDING) AS peak
+        FROM h
+    ), d AS (
+        SELECT *, r - AVG(r) OVER () AS dev FROM w
+    )
+    SELECT COUNT(*), COUNT(r), SUM(dev * dev), MAX((peak - nav) / peak),
+           MAX(CASE WHEN rn = 1 THEN nav END),
+           MAX(CASE WHEN rn = cnt THEN nav END),
+           {period_columns}
+    FROM d
+""".format(period_columns=",\n           ".join(
+    f"MAX(CASE WHEN rn = MIN(cnt, {days + 1}) THEN nav END)" for days in _PERIOD_DAYS.values()
+))
+
+
+def _drawdown(navs: Sequence[float]):
+    """一次扫描同时得到回撤序列 (负值) 和最大回撤 (正值)"""
+    navs = np.asarray(navs, dtype=np.float64)
+    peaks = np.maximum.accumulate(navs)
+    drawdowns = (navs - peaks) / peaks
+    return drawdowns, 0.0 - drawdowns.min().item()  # 避免 -0.0
+
 
 class MetricsCollector:
     """量化指标采集器"""
@@ -27,39 +70,35 @@ class MetricsCollector:
     
     def __init__(self, db_path: str = "./data/fund_history.db"):
         self.db_path = db_path
+        self._pool = get_connection_pool(db_path)
         self._ensure_db()
     
     def _ensure_db(self):
         """确保数据库表存在"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS fund_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                fund_code TEXT NOT NULL,
-                date TEXT NOT NULL,
-                sharpe_ratio REAL,
-                max_drawdown REAL,
-                volatility REAL,
-                beta REAL,
-                alpha REAL,
-                information_ratio REAL,
-                return_1m REAL,
-                return_3m REAL,
-                return_6m REAL,
-                return_1y REAL,
-                return_3y REAL,
-                morningstar_rating INTEGER,
-                source TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(fund_code, date)
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        with self._pool.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fund_metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fund_code TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    sharpe_ratio REAL,
+                    max_drawdown REAL,
+                    volatility REAL,
+                    beta REAL,
+                    alpha REAL,
+                    information_ratio REAL,
+                    return_1m REAL,
+                    return_3m REAL,
+                    return_6m REAL,
+                    return_1y REAL,
+                    return_3y REAL,
+                    morningstar_rating INTEGER,
+                    source TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(fund_code, date)
+                )
+            """)
     
     def calculate(self, fund_code: str, nav_history: List[FundNavHistory]) -> FundMetrics:
         """计算基金量化指标
@@ -71,19 +110,29 @@ class MetricsCollector:
         Returns:
             量化指标
         """
-        if len(nav_history) < 30:
+        # 按日期排序（升序）后转为净值数组
+        sorted_history = sorted(nav_history, key=lambda x: x.date)
+        navs = np.fromiter((h.nav for h in sorted_history), dtype=np.float64, count=len(sorted_history))
+        return self.calculate_from_arrays(fund_code, navs)
+    
+    def calculate_from_arrays(self, fund_code: str, navs: np.ndarray) -> FundMetrics:
+        """基于净值数组计算基金量化指标
+        
+        Args:
+            fund_code: 基金代码
+            navs: 按日期升序排列的净值 (float64)
+            
+        Returns:
+            量化指标
+        """
+        if len(navs) < 30:
             logger.warning(f"数据不足，无法计算指标（需要至少30天数据）")
             return FundMetrics(fund_code=fund_code, date=datetime.now())
         
-        # 按日期排序（升序）
-        sorted_history = sorted(nav_history, key=lambda x: x.date)
-        navs = [h.nav for h in sorted_history]
+        navs = np.asarray(navs, dtype=np.float64)
         
         # 计算日收益率
-        daily_returns = []
-        for i in range(1, len(navs)):
-            ret = (navs[i] - navs[i-1]) / navs[i-1]
-            daily_returns.append(ret)
+        daily_returns = np.diff(navs) / navs[:-1]
         
         # 波动率（年化）
         volatility = self._calculate_volatility(daily_returns)
@@ -94,13 +143,57 @@ class MetricsCollector:
         # 夏普比率
         sharpe_ratio = self._calculate_sharpe_ratio(daily_returns, volatility)
         
-        # 收益率
-        return_1m = self._calculate_period_return(navs, 22)   # 约1个月
-        return_3m = self._calculate_period_return(navs, 66)   # 约3个月
-        return_6m = self._calculate_period_return(navs, 132)  # 约6个月
-        return_1y = self._calculate_period_return(navs, 252)  # 约1年
-        return_3y = self._calculate_period_return(navs, 756)  # 约3年
+        # 收益率 (约1个月/3个月/6个月/1年/3年)
+        period_returns = {
+            period: self._calculate_period_return(navs, days)
+            for period, days in _PERIOD_DAYS.items()
+        }
+        
+        return self._build_metrics(fund_code, sharpe_ratio, max_drawdown, volatility, period_returns)
+    
+    def _compute_from_sql(self, fund_code: str, limit: int = 756) -> Optional[FundMetrics]:
+        """直接在 SQLite 中计算最近 limit 天净值的量化指标
+        
+        与 calculate 公式一致，但不把净值历史加载成 Python 对象列表。
+        
+        Returns:
+            量化指标；没有任何净值数据时返回 None
+        """
+        with self._pool.connection() as conn:
+            row = conn.execute(_SQL_METRICS, (fund_code, limit)).fetchone()
         
+        count, return_count, sum_sq_dev, max_drawdown, latest_nav, first_nav, *start_navs = row
+        if not count:
+            return None
+        if count < 30:
+            logger.warning(f"数据不足，无法计算指标（需要至少30天数据）")
+            return FundMetrics(fund_code=fund_code, date=datetime.now())
+        
+        # 波动率（样本标准差，年化）
+        volatility = math.sqrt(sum_sq_dev / (return_count - 1) * 252)
+        
+        # 夏普比率：日对数收益之和即 ln(期末净值/期初净值)
+        sharpe_ratio = 0.0
+        if volatility != 0:
+            annual_return = math.expm1(math.log(latest_nav / first_nav) * 252 / return_count)
+            sharpe_ratio = (annual_return - self.RISK_FREE_RATE) / volatility
+        
+        period_returns = {
+            period: (latest_nav - start_nav) / start_nav if count >= days else 0.0
+            for (period, days), start_nav in zip(_PERIOD_DAYS.items(), start_navs)
+        }
+        
+        return self._build_metrics(fund_code, sharpe_ratio, max_drawdown or 0.0, volatility, period_returns)
+    
+    @staticmethod
+    def _build_metrics(
+        fund_code: str,
+        sharpe_ratio: float,
+        max_drawdown: float,
+        volatility: float,
+        period_returns: Dict[str, float]
+    ) -> FundMetrics:
+        """将原始比率组装为 FundMetrics（百分比指标乘 100，保留两位小数）"""
         return FundMetrics(
             fund_code=fund_code,
             date=datetime.now(),
@@ -109,52 +202,39 @@ class MetricsCollector:
             volatility=round(volatility * 100, 2),
             beta=1.0,  # 需要基准数据计算
             alpha=0.0,
-            return_1m=round(return_1m * 100, 2),
-            return_3m=round(return_3m * 100, 2),
-            return_6m=round(return_6m * 100, 2),
-            return_1y=round(return_1y * 100, 2),
-            return_3y=round(return_3y * 100, 2),
+            return_1m=round(period_returns["1m"] * 100, 2),
+            return_3m=round(period_returns["3m"] * 100, 2),
+            return_6m=round(period_returns["6m"] * 100, 2),
+            return_1y=round(period_returns["1y"] * 100, 2),
+            return_3y=round(period_returns["3y"] * 100, 2),
             source="calculated"
         )
     
-    def _calculate_volatility(self, daily_returns: List[float]) -> float:
+    def _calculate_volatility(self, daily_returns: Sequence[float]) -> float:
         """计算年化波动率"""
         if len(daily_returns) < 2:
             return 0.0
         
-        mean_return = sum(daily_returns) / len(daily_returns)
-        variance = sum((r - mean_return) ** 2 for r in daily_returns) / (len(daily_returns) - 1)
-        std_dev = math.sqrt(variance)
-        
-        # 年化（假设252个交易日）
-        return std_dev * math.sqrt(252)
+        # 样本标准差，年化（假设252个交易日）
+        std_dev = np.std(np.asarray(daily_returns, dtype=np.float64), ddof=1)
+        return (std_dev * math.sqrt(252)).item()
     
-    def _calculate_max_drawdown(self, navs: List[float]) -> float:
+    def _calculate_max_drawdown(self, navs: Sequence[float]) -> float:
         """计算最大回撤"""
         if len(navs) < 2:
             return 0.0
         
-        max_drawdown = 0.0
-        peak = navs[0]
-        
-        for nav in navs:
-            if nav > peak:
-                peak = nav
-            drawdown = (peak - nav) / peak
-            max_drawdown = max(max_drawdown, drawdown)
-        
+        _, max_drawdown = _drawdown(navs)
         return max_drawdown
     
-    def _calculate_sharpe_ratio(self, daily_returns: List[float], volatility: float) -> float:
+    def _calculate_sharpe_ratio(self, daily_returns: Sequence[float], volatility: float) -> float:
         """计算夏普比率"""
         if volatility == 0 or len(daily_returns) == 0:
             return 0.0
         
-        # 年化收益率
-        total_return = 1.0
-        for r in daily_returns:
-            total_return *= (1 + r)
-        annual_return = (total_return ** (252 / len(daily_returns))) - 1
+        # 年化收益率 (对数收益求和，避免逐项连乘)
+        log_growth = np.log1p(np.asarray(daily_returns, dtype=np.float64)).sum()
+        annual_return = math.expm1(log_growth.item() * 252 / len(daily_returns))
         
         # 夏普比率
         return (annual_return - self.RISK_FREE_RATE) / volatility
@@ -167,7 +247,7 @@ class MetricsCollector:
         start_nav = navs[-(days + 1)] if len(navs) > days else navs[0]
         end_nav = navs[-1]
         
-        return (end_nav - start_nav) / start_nav
+        return float((end_nav - start_nav) / start_nav)
     
     def calculate_drawdown_series(self, navs: List[float]) -> List[float]:
         """计算回撤序列（用于图表阴影）
@@ -178,16 +258,8 @@ class MetricsCollector:
         if len(navs) < 2:
             return []
         
-        drawdowns = []
-        peak = navs[0]
-        
-        for nav in navs:
-            if nav > peak:
-                peak = nav
-            drawdown = (nav - peak) / peak  # 负值
-            drawdowns.append(round(drawdown * 100, 2))
-        
-        return drawdowns
+        drawdowns, _ = _drawdown(navs)
+        return np.round(drawdowns * 100, 2).tolist()
     
     def calculate_moving_average(self, navs: List[float], window: int = 20) -> List[Optional[float]]:
         """计算移动平均线
@@ -199,14 +271,12 @@ class MetricsCollector:
         Returns:
             移动平均序列
         """
-        ma = []
-        for i in range(len(navs)):
-            if i < window - 1:
-                ma.append(None)
-            else:
-                window_navs = navs[i - window + 1:i + 1]
-                ma.append(round(sum(window_navs) / window, 4))
-        return ma
+        if len(navs) < window:
+            return [None] * len(navs)
+        
+        windows = sliding_window_view(np.asarray(navs, dtype=np.float64), window)
+        ma = np.round(windows.mean(axis=1), 4).tolist()
+        return [None] * (window - 1) + ma
     
     def calculate_bollinger_bands(
         self, 
@@ -219,49 +289,38 @@ class MetricsCollector:
         Returns:
             {"upper": [...], "middle": [...], "lower": [...]}
         """
-        middle = self.calculate_moving_average(navs, window)
-        upper = []
-        lower = []
-        
-        for i in range(len(navs)):
-            if i < window - 1:
-                upper.append(None)
-                lower.append(None)
-            else:
-                window_navs = navs[i - window + 1:i + 1]
-                mean = middle[i]
-                variance = sum((n - mean) ** 2 for n in window_navs) / window
-                std = math.sqrt(variance)
-                upper.append(round(mean + num_std * std, 4))
-                lower.append(round(mean - num_std * std, 4))
+        if len(navs) < window:
+            empty = [None] * len(navs)
+            return {"upper": empty, "middle": list(empty), "lower": list(empty)}
+        
+        # 均值与标准差基于同一组窗口视图一次算出，标准差围绕取整后的中轨计算
+        windows = sliding_window_view(np.asarray(navs, dtype=np.float64), window)
+        mean = np.round(windows.mean(axis=1), 4)
+        std = np.sqrt(((windows - mean[:, None]) ** 2).mean(axis=1))
         
+        pad = [None] * (window - 1)
         return {
-            "upper": upper,
-            "middle": middle,
-            "lower": lower
+            "upper": pad + np.round(mean + num_std * std, 4).tolist(),
+            "middle": pad + mean.tolist(),
+            "lower": pad + np.round(mean - num_std * std, 4).tolist()
         }
     
     def save(self, metrics: FundMetrics):
         """保存指标到数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         date_str = metrics.date.strftime("%Y-%m-%d")
-        cursor.execute("""
-            INSERT OR REPLACE INTO fund_metrics 
-            (fund_code, date, sharpe_ratio, max_drawdown, volatility, beta, alpha,
-             information_ratio, return_1m, return_3m, return_6m, return_1y, return_3y,
-             morningstar_rating, source)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            metrics.fund_code, date_str, metrics.sharpe_ratio, metrics.max_drawdown,
-            metrics.volatility, metrics.beta, metrics.alpha, metrics.information_ratio,
-            metrics.return_1m, metrics.return_3m, metrics.return_6m, metrics.return_1y,
-            metrics.return_3y, metrics.morningstar_rating, metrics.source
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self._pool.connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO fund_metrics 
+                (fund_code, date, sharpe_ratio, max_drawdown, volatility, beta, alpha,
+                 information_ratio, return_1m, return_3m, return_6m, return_1y, return_3y,
+                 morningstar_rating, source)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                metrics.fund_code, date_str, metrics.sharpe_ratio, metrics.max_drawdown,
+                metrics.volatility, metrics.beta, metrics.alpha, metrics.information_ratio,
+                metrics.return_1m, metrics.return_3m, metrics.return_6m, metrics.return_1y,
+                metrics.return_3y, metrics.morningstar_rating, metrics.source
+            ))
     
     def update_all(self, fund_codes: List[str] = None) -> List[FundMetrics]:
         """更新所有基金的指标"""
@@ -269,53 +328,58 @@ class MetricsCollector:
         
         nav_collector = NavCollector(self.db_path)
         codes = fund_codes or nav_collector.DEFAULT_FUNDS
-        results = []
         
-        for code in codes:
+        def _update_one(code: str) -> Optional[FundMetrics]:
             try:
-                # 获取历史净值
-                history = nav_collector.get_history(code, limit=756)
-                if history:
-                    metrics = self.calculate(code, history)
+                # 直接在库内基于最近约3年净值计算
+                metrics = self._compute_from_sql(code)
+                if metrics:
                     self.save(metrics)
-                    results.append(metrics)
                     logger.info(f"✅ {code} 指标更新完成: 夏普={metrics.sharpe_ratio}, 最大回撤={metrics.max_drawdown}%")
+                    return metrics
             except Exception as e:
                 logger.error(f"更新 {code} 指标失败: {e}")
+            return None
+        
+        # 各基金相互独立，读库/写库为 I/O，线程池并发执行 (结果保持原顺序)
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(codes)))) as executor:
+            results = [m for m in executor.map(_update_one, codes) if m is not None]
+        
+        # 批量写入后按需刷新查询规划器统计信息
+        with self._pool.connection() as conn:
+            conn.execute("PRAGMA optimize")
         
         return results
     
     def get_latest(self, fund_code: str) -> Optional[FundMetrics]:
         """获取最新指标"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM fund_metrics 
-            WHERE fund_code = ? 
-            ORDER BY date DESC LIMIT 1
-        """, (fund_code,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        with self._pool.connection() as conn:
+            row = conn.execute("""
+                SELECT fund_code, date, sharpe_ratio, max_drawdown, volatility, beta, alpha,
+                       information_ratio, return_1m, return_3m, return_6m, return_1y, return_3y,
+                       morningstar_rating, source
+                FROM fund_metrics 
+                WHERE fund_code = ? 
+                ORDER BY date DESC LIMIT 1
+            """, (fund_code,)).fetchone()
         
         if not row:
             return None
         
         return FundMetrics(
-            fund_code=row[1],
-            date=datetime.strptime(row[2], "%Y-%m-%d"),
-            sharpe_ratio=row[3] or 0,
-            max_drawdown=row[4] or 0,
-            volatility=row[5] or 0,
-            beta=row[6] or 1,
-            alpha=row[7] or 0,
-            information_ratio=row[8] or 0,
-            return_1m=row[9] or 0,
-            return_3m=row[10] or 0,
-            return_6m=row[11] or 0,
-            return_1y=row[12] or 0,
-            return_3y=row[13] or 0,
-            morningstar_rating=row[14] or 0,
-            source=row[15] or "db"
+            fund_code=row["fund_code"],
+            date=datetime.fromisoformat(row["date"]),
+            sharpe_ratio=row["sharpe_ratio"] or 0,
+            max_drawdown=row["max_drawdown"] or 0,
+            volatility=row["volatility"] or 0,
+            beta=row["beta"] or 1,
+            alpha=row["alpha"] or 0,
+            information_ratio=row["information_ratio"] or 0,
+            return_1m=row["return_1m"] or 0,
+            return_3m=row["return_3m"] or 0,
+            return_6m=row["return_6m"] or 0,
+            return_1y=row["return_1y"] or 0,
+            return_3y=row["return_3y"] or 0,
+            morningstar_rating=row["morningstar_rating"] or 0,
+            source=row["source"] or "db"
         )
@@ -7,18 +7,48 @@
 """
 
 import json
+import time
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import logging
-import sqlite3
+import re
 import os
 
+import numpy as np
+
+try:
+    import akshare as _ak
+except ImportError:
+    _ak = None
+
+from utils.database import get_connection_pool
 from ..models import FundNavHistory
 
 logger = logging.getLogger(__name__)
 
+# 批量采集时的最大并发线程数
+MAX_WORKERS = 8
+
+# 天天基金请求遇到限流/服务端错误时的最大尝试次数
+MAX_RETRIES = 3
+
+# 单条 INSERT 语句写入的行数 (64 行 × 7 列，低于旧版 SQLite 的 999 参数上限)
+INSERT_CHUNK_ROWS = 64
+
+# 覆盖索引：按基金、日期倒序读取净值时无需回表
+_NAV_COVER_INDEX_SQL = """
+    CREATE INDEX idx_nav_cover 
+    ON fund_nav_history(fund_code, date DESC, nav, acc_nav, change_percent, volume, source)
+"""
+
+# 天天基金历史净值表格行: 日期 / 单位净值 / 累计净值 / 日增长率
+_NAV_ROW_RE = re.compile(
+    r'<tr><td>(\d{4}-\d{2}-\d{2})</td><td[^>]*>([^<]+)</td><td[^>]*>([^<]*)</td><td[^>]*>([^<]*)</td>'
+)
+
 
 class NavCollector:
     """净值数据采集器"""
@@ -37,44 +67,40 @@ class NavCollector:
     
     def __init__(self, db_path: str = "./data/fund_history.db"):
         self.db_path = db_path
+        self._pool = get_connection_pool(db_path)
         self._ensure_db()
-        self._akshare = None
-        try:
-            import akshare as ak
-            self._akshare = ak
-        except ImportError:
+        self._akshare = _ak
+        if _ak is None:
             logger.info("AKShare 未安装，将使用备用数据源")
     
     def _ensure_db(self):
         """确保数据库表存在"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 净值历史表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS fund_nav_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                fund_code TEXT NOT NULL,
-                date TEXT NOT NULL,
-                nav REAL NOT NULL,
-                acc_nav REAL,
-                change_percent REAL,
-                volume REAL,
-                source TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(fund_code, date)
-            )
-        """)
-        
-        # 创建索引
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_nav_fund_date 
-            ON fund_nav_history(fund_code, date DESC)
-        """)
-        
-        conn.commit()
-        conn.close()
+        with self._pool.connection() as conn:
+            # 净值历史表
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fund_nav_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fund_code TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    nav REAL NOT NULL,
+                    acc_nav REAL,
+                    change_percent REAL,
+                    volume REAL,
+                    source TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(fund_code, date)
+                )
+            """)
+            
+            # 覆盖索引 (取代旧的 idx_nav_fund_date，其键是本索引的前缀)
+            has_cover = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_nav_cover'"
+            ).fetchone()
+            if not has_cover:
+                conn.execute("DROP INDEX IF EXISTS idx_nav_fund_date")
+                conn.execute(_NAV_COVER_INDEX_SQL)
+                conn.execute("ANALYZE fund_nav_history")
         logger.info(f"✅ 数据库初始化完成: {self.db_path}")
     
     def collect(self, fund_code: str, days: int = 365) -> List[FundNavHistory]:
@@ -145,27 +171,31 @@ class NavCollector:
         }
         
         req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            html = response.read().decode('utf-8')
+        for attempt in range(MAX_RETRIES):
+            try:
+                with urllib.request.urlopen(req, timeout=10) as response:
+                    html = response.read().decode('utf-8')
+                break
+            except urllib.error.HTTPError as e:
+                # 限流或服务端错误时指数退避重试，其余错误直接抛出
+                if (e.code != 429 and e.code < 500) or attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
         
         # 解析返回的 HTML 表格
         return self._parse_eastmoney_html(fund_code, html)
     
     def _parse_eastmoney_html(self, fund_code: str, html: str) -> List[FundNavHistory]:
         """解析天天基金返回的 HTML"""
-        import re
         results = []
         
         # 提取表格行
-        pattern = r'<tr><td>(\d{4}-\d{2}-\d{2})</td><td[^>]*>([^<]+)</td><td[^>]*>([^<]*)</td><td[^>]*>([^<]*)</td>'
-        matches = re.findall(pattern, html)
-        
-        for match in matches:
+        for match in _NAV_ROW_RE.finditer(html):
             try:
-                date_str, nav_str, acc_nav_str, change_str = match
+                date_str, nav_str, acc_nav_str, change_str = match.groups()
                 nav_record = FundNavHistory(
                     fund_code=fund_code,
-                    date=datetime.strptime(date_str, "%Y-%m-%d"),
+                    date=datetime.fromisoformat(date_str),
                     nav=float(nav_str),
                     acc_nav=float(acc_nav_str) if acc_nav_str else float(nav_str),
                     change_percent=float(change_str.replace('%', '')) if change_str and '%' in change_str else 0,
@@ -179,42 +209,59 @@ class NavCollector:
     
     def _generate_mock_data(self, fund_code: str, days: int) -> List[FundNavHistory]:
         """生成模拟数据（开发环境）"""
-        import random
-        results = []
+        rng = np.random.default_rng()
         
-        base_nav = random.uniform(1.0, 5.0)
-        current_nav = base_nav
+        # 模拟每日涨跌：均值0.05%, 标准差1.5%，一次生成整段序列
+        changes = rng.normal(0.0005, 0.015, days)
+        navs = rng.uniform(1.0, 5.0) * np.cumprod(1 + changes)
+        acc_navs = navs * rng.uniform(1.0, 1.5, days)
         
-        for i in range(days, 0, -1):
-            date = datetime.now() - timedelta(days=i)
-            # 模拟每日涨跌
-            change = random.gauss(0.0005, 0.015)  # 均值0.05%, 标准差1.5%
-            current_nav *= (1 + change)
-            
-            results.append(FundNavHistory(
+        now = datetime.now()
+        results = [
+            FundNavHistory(
                 fund_code=fund_code,
-                date=date,
-                nav=round(current_nav, 4),
-                acc_nav=round(current_nav * random.uniform(1.0, 1.5), 4),
-                change_percent=round(change * 100, 2),
+                date=now - timedelta(days=days - i),
+                nav=nav,
+                acc_nav=acc_nav,
+                change_percent=change,
                 source="mock"
+            )
+            for i, (nav, acc_nav, change) in enumerate(zip(
+                np.round(navs, 4).tolist(),
+                np.round(acc_navs, 4).tolist(),
+                np.round(changes * 100, 2).tolist()
             ))
+        ]
         
         logger.info(f"📊 生成 {len(results)} 条模拟数据")
         return results
     
     def collect_all(self, fund_codes: List[str] = None) -> List[FundNavHistory]:
-        """采集所有关注基金的净值"""
+        """采集所有关注基金的净值
+        
+        净值表为空（首次采集）时先汇总全部结果，再通过 bulk_load 一次性导入。
+        """
         codes = fund_codes or self.DEFAULT_FUNDS
-        all_results = []
+        cold_start = self._is_empty()
         
-        for code in codes:
+        def _collect_one(code: str) -> List[FundNavHistory]:
             try:
                 results = self.collect(code)
-                self.save(results)
-                all_results.extend(results)
+                if not cold_start:
+                    self.save(results)
+                return results
             except Exception as e:
                 logger.error(f"采集 {code} 失败: {e}")
+                return []
+        
+        # 各基金的网络请求相互独立，线程池并发采集 (结果保持原顺序)
+        all_results = []
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(codes)))) as executor:
+            for results in executor.map(_collect_one, codes):
+                all_results.extend(results)
+        
+        if cold_start:
+            self.bulk_load(all_results)
         
         logger.info(f"✅ 共采集 {len(all_results)} 条净值数据")
         return all_results
@@ -224,33 +271,59 @@ class NavCollector:
         from tools.market_data import get_market_service
         
         service = get_market_service()
-        results = []
         
-        for code in self.DEFAULT_FUNDS:
+        def _fetch_one(code: str) -> Optional[Dict]:
             try:
-                nav_data = service.get_fund_nav(code)
-                results.append(nav_data.to_dict())
+                return service.get_fund_nav(code).to_dict()
             except Exception as e:
                 logger.warning(f"获取 {code} 实时估值失败: {e}")
+                return None
         
-        return results
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(self.DEFAULT_FUNDS))) as executor:
+            return [item for item in executor.map(_fetch_one, self.DEFAULT_FUNDS) if item is not None]
     
     def save(self, records: List[FundNavHistory]):
-        """保存到数据库"""
+        """保存到数据库 (单事务，每条语句插入多行)"""
         if not records:
             return
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        rows = self._to_rows(records)
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._insert_rows(conn, rows)
+        logger.info(f"✅ 保存 {len(records)} 条记录到数据库")
+    
+    def bulk_load(self, records: List[FundNavHistory]):
+        """批量导入净值 (冷启动/历史回填)
         
+        先删除覆盖索引，写入全部记录后再一次性重建，避免逐行维护索引。
+        UNIQUE(fund_code, date) 约束保留，仍按其去重。
+        重建索引期间其他读取会退化为回表查询，增量保存请使用 save。
+        """
+        if not records:
+            return
+        
+        rows = self._to_rows(records)
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DROP INDEX IF EXISTS idx_nav_cover")
+            self._insert_rows(conn, rows)
+            conn.execute(_NAV_COVER_INDEX_SQL)
+        logger.info(f"✅ 批量导入 {len(records)} 条记录到数据库")
+    
+    def _is_empty(self) -> bool:
+        """净值表中是否还没有任何数据"""
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM fund_nav_history LIMIT 1").fetchone() is None
+    
+    @staticmethod
+    def _to_rows(records: List[FundNavHistory]) -> List[tuple]:
+        """将净值记录转换为插入参数，跳过无法转换的记录"""
+        rows = []
         for record in records:
             try:
                 date_str = record.date.strftime("%Y-%m-%d") if isinstance(record.date, datetime) else str(record.date)
-                cursor.execute("""
-                    INSERT OR REPLACE INTO fund_nav_history 
-                    (fund_code, date, nav, acc_nav, change_percent, volume, source)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
+                rows.append((
                     record.fund_code,
                     date_str,
                     record.nav,
@@ -261,10 +334,19 @@ class NavCollector:
                 ))
             except Exception as e:
                 logger.warning(f"保存记录失败: {e}")
-        
-        conn.commit()
-        conn.close()
-        logger.info(f"✅ 保存 {len(records)} 条记录到数据库")
+        return rows
+    
+    @staticmethod
+    def _insert_rows(conn, rows: List[tuple]):
+        """按 INSERT_CHUNK_ROWS 行一组写入 (调用方负责事务)"""
+        for i in range(0, len(rows), INSERT_CHUNK_ROWS):
+            chunk = rows[i:i + INSERT_CHUNK_ROWS]
+            placeholders = ",".join(["(?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+            conn.execute(f"""
+                INSERT OR REPLACE INTO fund_nav_history 
+                (fund_code, date, nav, acc_nav, change_percent, volume, source)
+                VALUES {placeholders}
+            """, [value for row in chunk for value in row])
     
     def get_history(
         self, 
@@ -284,10 +366,10 @@ class NavCollector:
         Returns:
             净值历史列表
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM fund_nav_history WHERE fund_code = ?"
+        query = """
+            SELECT fund_code, date, nav, acc_nav, change_percent, volume, source
+            FROM fund_nav_history WHERE fund_code = ?
+        """
         params = [fund_code]
         
         if start_date:
@@ -301,24 +383,42 @@ class NavCollector:
         query += " ORDER BY date DESC LIMIT ?"
         params.append(limit)
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
         
         results = []
         for row in rows:
             results.append(FundNavHistory(
-                fund_code=row[1],
-                date=datetime.strptime(row[2], "%Y-%m-%d"),
-                nav=row[3],
-                acc_nav=row[4] or row[3],
-                change_percent=row[5] or 0,
-                volume=row[6] or 0,
-                source=row[7] or "db"
+                fund_code=row["fund_code"],
+                date=datetime.fromisoformat(row["date"]),
+                nav=row["nav"],
+                acc_nav=row["acc_nav"] or row["nav"],
+                change_percent=row["change_percent"] or 0,
+                volume=row["volume"] or 0,
+                source=row["source"] or "db"
             ))
         
         return results
     
+    def get_nav_array(self, fund_code: str, limit: int = 365) -> np.ndarray:
+        """获取最近 limit 天的单位净值数组 (按日期升序)，不构造 FundNavHistory 对象
+        
+        Args:
+            fund_code: 基金代码
+            limit: 最大记录数
+            
+        Returns:
+            float64 净值数组
+        """
+        with self._pool.connection() as conn:
+            cursor = conn.execute("""
+                SELECT nav FROM (
+                    SELECT date, nav FROM fund_nav_history
+                    WHERE fund_code = ? ORDER BY date DESC LIMIT ?
+                ) ORDER BY date
+            """, (fund_code, limit))
+            return np.fromiter((row[0] for row in cursor), dtype=np.float64)
+    
     def get_chart_data(
         self, 
         fund_code: str, 
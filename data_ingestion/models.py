@@ -18,7 +18,16 @@ class EventType(Enum):
     MARKET_EVENT = "market_event"   # 市场事件
 
 
-@dataclass
+# 各事件类型在图表上的标记样式
+_MARKER_STYLES = {
+    EventType.DIVIDEND: {"color": "#10b981", "shape": "arrowDown", "text": "💰"},
+    EventType.SPLIT: {"color": "#3b82f6", "shape": "circle", "text": "📊"},
+    EventType.MANAGER_CHANGE: {"color": "#f59e0b", "shape": "square", "text": "👤"},
+    EventType.MARKET_EVENT: {"color": "#ef4444", "shape": "arrowUp", "text": "⚠️"}
+}
+
+
+@dataclass(slots=True)
 class FundNavHistory:
     """基金净值历史数据"""
     fund_code: str
@@ -60,7 +69,7 @@ class FundNavHistory:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class FundMetrics:
     """基金量化指标"""
     fund_code: str
@@ -87,7 +96,7 @@ class FundMetrics:
         return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class FundEvent:
     """基金事件"""
     fund_code: str
@@ -114,13 +123,7 @@ class FundEvent:
         timestamp = int(self.date.timestamp()) if isinstance(self.date, datetime) else self.date
         
         # 根据事件类型设置样式
-        styles = {
-            EventType.DIVIDEND: {"color": "#10b981", "shape": "arrowDown", "text": "💰"},
-            EventType.SPLIT: {"color": "#3b82f6", "shape": "circle", "text": "📊"},
-            EventType.MANAGER_CHANGE: {"color": "#f59e0b", "shape": "square", "text": "👤"},
-            EventType.MARKET_EVENT: {"color": "#ef4444", "shape": "arrowUp", "text": "⚠️"}
-        }
-        style = styles.get(self.event_type, styles[EventType.MARKET_EVENT])
+        style = _MARKER_STYLES.get(self.event_type, _MARKER_STYLES[EventType.MARKET_EVENT])
         
         return {
             "time": timestamp,
@@ -132,7 +135,7 @@ class FundEvent:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class FundHolding:
     """基金持仓"""
     fund_code: str
@@ -147,7 +150,7 @@ class FundHolding:
         return asdict(self)
 
 
-@dataclass 
+@dataclass(slots=True)
 class FundSectorAllocation:
     """基金行业配置"""
     fund_code: str
@@ -159,7 +162,7 @@ class FundSectorAllocation:
         return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ChartDataResponse:
     """图表数据响应"""
     fund_code: str
@@ -24,6 +24,7 @@ from .core.exceptions import HelloAgentsException
 from .agents.simple_agent import SimpleAgent
 from .agents.function_call_agent import FunctionCallAgent
 from .agents.react_agent import ReActAgent
+from .agents.parallel_react_agent import ParallelReActAgent
 from .agents.reflection_agent import ReflectionAgent
 from .agents.plan_solve_agent import PlanAndSolveAgent
 from .agents.tool_aware_agent import ToolAwareSimpleAgent
@@ -52,6 +53,7 @@ __all__ = [
     "SimpleAgent",
     "FunctionCallAgent",
     "ReActAgent",
+    "ParallelReActAgent",
     "ReflectionAgent",
     "PlanAndSolveAgent",
     "ToolAwareSimpleAgent",
@@ -3,6 +3,7 @@
 from .simple_agent import SimpleAgent
 from .function_call_agent import FunctionCallAgent
 from .react_agent import ReActAgent
+from .parallel_react_agent import ParallelReActAgent
 from .reflection_agent import ReflectionAgent
 from .plan_solve_agent import PlanAndSolveAgent
 from .tool_aware_agent import ToolAwareSimpleAgent
@@ -11,6 +12,7 @@ __all__ = [
     "SimpleAgent",
     "FunctionCallAgent",
     "ReActAgent",
+    "ParallelReActAgent",
     "ReflectionAgent",
     "PlanAndSolveAgent",
     "ToolAwareSimpleAgent"
@@ -0,0 +1,76 @@
+"""Parallel ReAct Agent实现 - 单步内并发执行多个工具调用"""
+
+import os
+import re
+import asyncio
+import concurrent.futures
+from typing import List, Tuple
+
+from .react_agent import ReActAgent
+
+# 单步内并发执行的工具调用上限
+TOOL_CONCURRENCY_LIMIT = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "4"))
+
+# 匹配单行工具调用：可选的列表符号/反引号包裹的 tool_name[tool_input]
+_ACTION_LINE_RE = re.compile(r"^[-*\s]*`?(\w+)\s*\[(.*)\]`?\s*$")
+
+
+class ParallelReActAgent(ReActAgent):
+    """
+    支持并行工具调用的 ReActAgent
+
+    当 LLM 在一次回应的 Action 中给出多个互不依赖的工具调用（每行一个）时，
+    这些调用会并发执行，单步耗时从各工具耗时之和降为其中的最大值。
+    单个工具失败只会体现在对应的 Observation 中，不影响同批其他调用。
+    """
+
+    def __init__(self, *args, concurrency_limit: int = TOOL_CONCURRENCY_LIMIT, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.concurrency_limit = max(1, concurrency_limit)
+
+    def _parse_actions(self, action_text: str) -> List[Tuple[str, str]]:
+        """解析 Action 中的全部工具调用，每行一个"""
+        calls = []
+        for line in action_text.splitlines():
+            match = _ACTION_LINE_RE.match(line.strip())
+            if match and match.group(1) != "Finish":
+                calls.append((match.group(1), match.group(2).strip()))
+
+        # 无法按行解析时（如参数跨行），回退到单工具解析
+        return calls or super()._parse_actions(action_text)
+
+    def _execute_tools(self, calls: List[Tuple[str, str]]) -> List[str]:
+        if len(calls) <= 1:
+            return super()._execute_tools(calls)
+
+        max_workers = min(self.concurrency_limit, len(calls))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.tool_registry.execute_tool, name, tool_input)
+                for name, tool_input in calls
+            ]
+            return [self._result_or_error(name, future) for (name, _), future in zip(calls, futures)]
+
+    async def _aexecute_tools(self, calls: List[Tuple[str, str]]) -> List[str]:
+        # 每步新建信号量：asyncio 原语会绑定到首次等待时的事件循环，跨 asyncio.run 复用会报错
+        semaphore = asyncio.Semaphore(self.concurrency_limit)
+
+        async def _run(name: str, tool_input: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(self.tool_registry.execute_tool, name, tool_input)
+
+        results = await asyncio.gather(
+            *[_run(name, tool_input) for name, tool_input in calls],
+            return_exceptions=True
+        )
+        return [
+            f"错误：执行工具 '{name}' 时发生异常: {result}" if isinstance(result, BaseException) else result
+            for (name, _), result in zip(calls, results)
+        ]
+
+    @staticmethod
+    def _result_or_error(name: str, future: concurrent.futures.Future) -> str:
+        try:
+            return future.result()
+        except Exception as e:
+            return f"错误：执行工具 '{name}' 时发生异常: {str(e)}"
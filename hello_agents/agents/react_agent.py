@@ -1,7 +1,8 @@
 """ReAct Agent实现 - 推理与行动结合的智能体"""
 
 import re
-from typing import Optional, List, Tuple
+import functools
+from typing import Callable, Optional, List, Tuple
 from ..core.agent import Agent
 from ..core.llm import HelloAgentsLLM
 from ..core.config import Config
@@ -125,18 +126,14 @@ class ReActAgent(Agent):
         
         yield f"🤖 {self.name} 开始处理问题: {input_text}\n"
         
+        render_prompt = self._bind_prompt(input_text)
+        
         while current_step < self.max_steps:
             current_step += 1
             yield f"\n--- 第 {current_step} 步 ---\n"
             
             # 构建提示词
-            tools_desc = self.tool_registry.get_tools_description()
-            history_str = "\n".join(self.current_history)
-            prompt = self.prompt_template.format(
-                tools=tools_desc,
-                question=input_text,
-                history=history_str
-            )
+            prompt = render_prompt(history="\n".join(self.current_history))
             
             # 调用LLM流式生成
             messages = [{"role": "user", "content": prompt}]
@@ -168,22 +165,23 @@ class ReActAgent(Agent):
                 return
             
             # 执行工具调用
-            tool_name, tool_input = self._parse_action(action)
-            if not tool_name or tool_input is None:
+            calls = self._parse_actions(action)
+            if not calls:
                 obs = "Observation: 无效的Action格式，请检查。"
                 self.current_history.append(obs)
                 yield f"\n{obs}\n"
                 continue
             
-            yield f"\n🎬 执行工具: {tool_name}\n"
+            for tool_name, _ in calls:
+                yield f"\n🎬 执行工具: {tool_name}\n"
             
-            # 调用工具 (同步执行，以后可以考虑异步工具)
-            observation = self.tool_registry.execute_tool(tool_name, tool_input)
-            yield f"👀 观察结果: {observation}\n"
+            observations = await self._aexecute_tools(calls)
             
-            # 更新历史
-            self.current_history.append(f"Action: {action}")
-            self.current_history.append(f"Observation: {observation}")
+            for (tool_name, tool_input), observation in zip(calls, observations):
+                yield f"👀 观察结果: {observation}\n"
+                # 更新历史
+                self.current_history.append(f"Action: {tool_name}[{tool_input}]")
+                self.current_history.append(f"Observation: {observation}")
         
         if current_step >= self.max_steps:
             yield "\n⏰ 已达到最大步数，流程终止。\n"
@@ -207,18 +205,14 @@ class ReActAgent(Agent):
         
         print(f"\n🤖 {self.name} 开始处理问题: {input_text}")
         
+        render_prompt = self._bind_prompt(input_text)
+        
         while current_step < self.max_steps:
             current_step += 1
             print(f"\n--- 第 {current_step} 步 ---")
             
             # 构建提示词
-            tools_desc = self.tool_registry.get_tools_description()
-            history_str = "\n".join(self.current_history)
-            prompt = self.prompt_template.format(
-                tools=tools_desc,
-                question=input_text,
-                history=history_str
-            )
+            prompt = render_prompt(history="\n".join(self.current_history))
             
             # 调用LLM
             messages = [{"role": "user", "content": prompt}]
@@ -248,20 +242,22 @@ class ReActAgent(Agent):
                 return final_answer
             
             # 执行工具调用
-            tool_name, tool_input = self._parse_action(action)
-            if not tool_name or tool_input is None:
+            calls = self._parse_actions(action)
+            if not calls:
                 self.current_history.append("Observation: 无效的Action格式，请检查。")
                 continue
             
-            print(f"🎬 行动: {tool_name}[{tool_input}]")
+            for tool_name, tool_input in calls:
+                print(f"🎬 行动: {tool_name}[{tool_input}]")
             
             # 调用工具
-            observation = self.tool_registry.execute_tool(tool_name, tool_input)
-            print(f"👀 观察: {observation}")
+            observations = self._execute_tools(calls)
             
-            # 更新历史
-            self.current_history.append(f"Action: {action}")
-            self.current_history.append(f"Observation: {observation}")
+            for (tool_name, tool_input), observation in zip(calls, observations):
+                print(f"👀 观察: {observation}")
+                # 更新历史
+                self.current_history.append(f"Action: {tool_name}[{tool_input}]")
+                self.current_history.append(f"Observation: {observation}")
         
         print("⏰ 已达到最大步数，流程终止。")
         final_answer = "抱歉，我无法在限定步数内完成这个任务。"
@@ -311,6 +307,35 @@ class ReActAgent(Agent):
             
         return None, None
     
+    def _bind_prompt(self, input_text: str) -> Callable[..., str]:
+        """
+        绑定一次运行内不变的模板参数（工具描述、问题），
+        每一步只需再传入执行历史。
+        """
+        return functools.partial(
+            self.prompt_template.format,
+            tools=self.tool_registry.get_tools_description(),
+            question=input_text
+        )
+    
+    def _parse_actions(self, action_text: str) -> List[Tuple[str, str]]:
+        """
+        解析一次回应中需要执行的工具调用列表。
+        默认每步只执行一个工具，子类可覆盖以支持多工具调用。
+        """
+        tool_name, tool_input = self._parse_action(action_text)
+        if not tool_name or tool_input is None:
+            return []
+        return [(tool_name, tool_input)]
+    
+    def _execute_tools(self, calls: List[Tuple[str, str]]) -> List[str]:
+        """依次执行工具调用，返回与 calls 一一对应的观察结果"""
+        return [self.tool_registry.execute_tool(name, tool_input) for name, tool_input in calls]
+    
+    async def _aexecute_tools(self, calls: List[Tuple[str, str]]) -> List[str]:
+        """异步执行工具调用 (默认同步执行，以后可以考虑异步工具)"""
+        return self._execute_tools(calls)
+    
     def _parse_action_input(self, action_text: str) -> str:
         """解析行动输入值"""
         _, tool_input = self._parse_action(action_text)
@@ -119,16 +119,20 @@ class ToolRegistry:
 
         Returns:
             工具描述字符串，用于构建提示词
+
+        按名称排序输出，保证相同工具集渲染出的提示词前缀逐字节一致，
+        便于命中模型服务端的前缀缓存 (prompt caching)。
         """
         descriptions = []
 
         # Tool对象描述
-        for tool in self._tools.values():
+        for name in sorted(self._tools):
+            tool = self._tools[name]
             descriptions.append(f"- {tool.name}: {tool.description}")
 
         # 函数工具描述
-        for name, info in self._functions.items():
-            descriptions.append(f"- {name}: {info['description']}")
+        for name in sorted(self._functions):
+            descriptions.append(f"- {name}: {self._functions[name]['description']}")
 
         return "\n".join(descriptions) if descriptions else "暂无可用工具"
 
@@ -134,6 +134,10 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 基金估值助手 - HelloAgents 框架版")
     logger.info("=" * 60)
     
+    # 同步路由 (def) 在 AnyIO 线程池中执行，默认 40 个线程，调大以支持更高并发
+    import anyio.to_thread
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 100
+    
     # 配置验证
     config = get_config()
     print_config_status()
@@ -208,6 +212,9 @@ async def lifespan(app: FastAPI):
     # 启动全量行情后台刷新任务
     asyncio.create_task(refresh_global_market_task())
     
+    # 启动板块指数后台刷新任务 (接口直接读取缓存)
+    asyncio.create_task(refresh_category_indices_task())
+    
     logger.info("=" * 60)
     logger.info(f"🌐 访问: http://localhost:{config.server.port}")
     logger.info("=" * 60)
@@ -832,12 +839,13 @@ async def get_linus_report(fund_code: str):
     service = get_market_service()
     stats_tool = StatisticsTool()
     
-    # Get fund details
-    details = service.get_fund_details(fund_code)
-    
-    # Get historical NAV for analysis
+    # 详情、历史净值、实时估值互不依赖，并发获取
     # P3 Fix: Use range_type instead of days
-    history = service.get_fund_nav_history(fund_code, range_type="y")
+    details, history, current_nav = await asyncio.gather(
+        asyncio.to_thread(service.get_fund_details, fund_code),
+        asyncio.to_thread(service.get_fund_nav_history, fund_code, range_type="y"),
+        asyncio.to_thread(service.get_fund_nav, fund_code),
+    )
     
     if not history or len(history) < 30:
         return {"error": "数据不足无法生成报告", "fund_code": fund_code}
@@ -854,9 +862,6 @@ async def get_linus_report(fund_code: str):
     
     indicators = stats_tool.calculate_indicators(returns)
     
-    # Get current valuation
-    current_nav = service.get_fund_nav(fund_code)
-    
     # 30-day price range analysis
     navs_30d = navs[:30] if len(navs) >= 30 else navs
     high_30d = max(navs_30d)
@@ -1078,6 +1083,17 @@ async def refresh_global_market_task():
         
         await asyncio.sleep(60)
 
+async def refresh_category_indices_task():
+    """后台定时刷新板块指数缓存"""
+    from services.category_service import get_category_service, CategoryService
+    
+    while True:
+        await asyncio.sleep(CategoryService.CACHE_TTL_MINUTES * 60)
+        try:
+            await get_category_service().refresh_all_indices()
+        except Exception as e:
+            logger.error(f"Error in category index refresher: {e}")
+
 # ============ 全球市场数据 API ============
 
 @app.get("/api/market/global")
@@ -1318,17 +1334,19 @@ async def get_portfolio_correlation(holdings: List[str] = Body(..., embed=True),
     market_service = get_market_service()
     stats_tool = StatisticsTool()
     
-    # 获取历史数据
+    # 并发获取各基金历史数据 (半年数据用于计算相关性，比较快且足够参考)
+    histories = await asyncio.gather(
+        *[market_service.get_historical_nav_async(code, range_type="6m") for code in holdings],
+        return_exceptions=True
+    )
+    
     fund_returns = {}
-    for code in holdings:
-        try:
-            # 获取半年数据用于计算相关性，比较快且足够参考
-            history = await market_service.get_historical_nav_async(code, range_type="6m")
-            if history and history.points:
-                # 提取涨跌幅序列
-                fund_returns[code] = [p.change_percent for p in history.points]
-        except Exception:
+    for code, history in zip(holdings, histories):
+        if isinstance(history, Exception):
             continue
+        if history and history.points:
+            # 提取涨跌幅序列
+            fund_returns[code] = [p.change_percent for p in history.points]
             
     if len(fund_returns) < 2:
         return {"funds": list(fund_returns.keys()), "matrix": [[1.0] for _ in fund_returns]}
@@ -1369,13 +1387,19 @@ async def get_portfolio_analytics(current_user: dict = Depends(get_current_user)
     total_value = valuation.get("total_value", 1)
     portfolio_daily_returns = None
     
-    for h in holdings:
+    # 并发获取各基金1年历史用于深度分析
+    histories = await asyncio.gather(
+        *[market_service.get_historical_nav_async(h["fund_code"], range_type="y") for h in holdings],
+        return_exceptions=True
+    )
+    
+    for h, history in zip(holdings, histories):
         code = h["fund_code"]
         weight = h["market_value"] / total_value
         
         try:
-            # 获取1年历史用于深度分析
-            history = await market_service.get_historical_nav_async(code, range_type="y")
+            if isinstance(history, Exception):
+                raise history
             if history and history.points:
                 # Ensure change_percent is not None
                 returns = np.array([(p.change_percent or 0.0) / 100.0 for p in history.points])
@@ -9,11 +9,14 @@
 import os
 import sqlite3
 import json
+import asyncio
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict
 import logging
 
+from utils.database import get_connection_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -93,6 +96,8 @@ class CategoryService:
         self._index_cache: Dict[int, Dict] = {}  # 板块指数缓存
         self._cache_updated_at: datetime = None
         self._ensure_db()
+        # 读写共用调优过的长连接；异步路径通过 asyncio.to_thread 访问，不阻塞事件循环
+        self._pool = get_connection_pool(db_path)
     
     def _ensure_db(self):
         """初始化数据库"""
@@ -162,20 +167,18 @@ class CategoryService:
     
     def get_all_categories(self) -> List[Category]:
         """获取所有板块"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT c.id, c.name, c.slug, c.description, c.icon,
-                   COUNT(fc.fund_code) as fund_count
-            FROM categories c
-            LEFT JOIN fund_categories fc ON c.id = fc.category_id
-            GROUP BY c.id
-            ORDER BY fund_count DESC
-        """)
+        with self._pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT c.id, c.name, c.slug, c.description, c.icon,
+                       COUNT(fc.fund_code) as fund_count
+                FROM categories c
+                LEFT JOIN fund_categories fc ON c.id = fc.category_id
+                GROUP BY c.id
+                ORDER BY fund_count DESC
+            """).fetchall()
         
         categories = []
-        for row in cursor.fetchall():
+        for row in rows:
             cat = Category(
                 id=row[0],
                 name=row[1],
@@ -196,25 +199,19 @@ class CategoryService:
             
             categories.append(cat)
         
-        conn.close()
         return categories
     
     def get_category_by_slug(self, slug: str) -> Optional[Category]:
         """根据 slug 获取板块"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT c.id, c.name, c.slug, c.description, c.icon,
-                   COUNT(fc.fund_code) as fund_count
-            FROM categories c
-            LEFT JOIN fund_categories fc ON c.id = fc.category_id
-            WHERE c.slug = ?
-            GROUP BY c.id
-        """, (slug,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        with self._pool.connection() as conn:
+            row = conn.execute("""
+                SELECT c.id, c.name, c.slug, c.description, c.icon,
+                       COUNT(fc.fund_code) as fund_count
+                FROM categories c
+                LEFT JOIN fund_categories fc ON c.id = fc.category_id
+                WHERE c.slug = ?
+                GROUP BY c.id
+            """, (slug,)).fetchone()
         
         if row:
             return Category(
@@ -231,36 +228,31 @@ class CategoryService:
     
     def add_fund_to_category(self, fund_code: str, category_slug: str, weight: float = 1.0):
         """将基金添加到板块"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 获取 category_id
-        cursor.execute("SELECT id FROM categories WHERE slug = ?", (category_slug,))
-        row = cursor.fetchone()
-        
-        if row:
-            cursor.execute("""
-                INSERT OR REPLACE INTO fund_categories (fund_code, category_id, weight)
-                VALUES (?, ?, ?)
-            """, (fund_code, row[0], weight))
-            conn.commit()
-        
-        conn.close()
+        with self._pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            # 获取 category_id
+            cursor.execute("SELECT id FROM categories WHERE slug = ?", (category_slug,))
+            row = cursor.fetchone()
+            
+            if row:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO fund_categories (fund_code, category_id, weight)
+                    VALUES (?, ?, ?)
+                """, (fund_code, row[0], weight))
     
     def get_fund_categories(self, fund_code: str) -> List[Category]:
         """获取基金所属的板块（多维度）"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT c.id, c.name, c.slug, c.description, c.icon, fc.weight
-            FROM fund_categories fc
-            JOIN categories c ON fc.category_id = c.id
-            WHERE fc.fund_code = ?
-        """, (fund_code,))
+        with self._pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT c.id, c.name, c.slug, c.description, c.icon, fc.weight
+                FROM fund_categories fc
+                JOIN categories c ON fc.category_id = c.id
+                WHERE fc.fund_code = ?
+            """, (fund_code,)).fetchall()
         
         categories = []
-        for row in cursor.fetchall():
+        for row in rows:
             categories.append(Category(
                 id=row[0],
                 name=row[1],
@@ -269,26 +261,30 @@ class CategoryService:
                 icon=row[4]
             ))
         
-        conn.close()
         return categories
     
     def get_category_funds(self, category_slug: str, limit: int = 50) -> List[Dict]:
         """获取板块内的基金列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT fc.fund_code, fc.weight
-            FROM fund_categories fc
-            JOIN categories c ON fc.category_id = c.id
-            WHERE c.slug = ?
-            ORDER BY fc.weight DESC
-            LIMIT ?
-        """, (category_slug, limit))
-        
-        funds = [{"fund_code": row[0], "weight": row[1]} for row in cursor.fetchall()]
-        conn.close()
-        return funds
+        with self._pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT fc.fund_code, fc.weight
+                FROM fund_categories fc
+                JOIN categories c ON fc.category_id = c.id
+                WHERE c.slug = ?
+                ORDER BY fc.weight DESC
+                LIMIT ?
+            """, (category_slug, limit)).fetchall()
+        
+        return [{"fund_code": row[0], "weight": row[1]} for row in rows]
+    
+    def _get_fund_mappings(self, category_id: int) -> List[Tuple[str, float]]:
+        """获取板块内的 (基金代码, 权重) 列表"""
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT fund_code, weight FROM fund_categories WHERE category_id = ?",
+                (category_id,)
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
     
     # ============ 板块指数实时计算 ============
     
@@ -297,16 +293,8 @@ class CategoryService:
         
         使用加权平均涨跌幅和总 AUM
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # 获取板块内的基金
-        cursor.execute("""
-            SELECT fund_code, weight FROM fund_categories WHERE category_id = ?
-        """, (category_id,))
-        
-        fund_mappings = cursor.fetchall()
-        conn.close()
+        fund_mappings = await asyncio.to_thread(self._get_fund_mappings, category_id)
         
         if not fund_mappings:
             return {
@@ -365,12 +353,23 @@ class CategoryService:
         
         return result
     
+    async def get_category_index(self, category_id: int) -> Dict:
+        """获取板块指数
+        
+        优先返回 refresh_all_indices 预先算好的缓存，缓存缺失或过期时才实时计算
+        """
+        cached = self._index_cache.get(category_id)
+        if cached and cached.get("updated_at") and \
+           datetime.now() - cached["updated_at"] < timedelta(minutes=self.CACHE_TTL_MINUTES):
+            return cached
+        return await self.calculate_category_index(category_id)
+    
     async def _get_fund_data(self, fund_code: str) -> Optional[Dict]:
         """获取基金数据"""
         try:
             from data_ingestion.collectors import NavCollector
             collector = NavCollector()
-            history = collector.get_history(fund_code, limit=2)
+            history = await asyncio.to_thread(collector.get_history, fund_code, limit=2)
             
             if len(history) >= 2:
                 today = history[0]
@@ -402,7 +401,7 @@ class CategoryService:
         
         由定时任务每15分钟调用
         """
-        categories = self.get_all_categories()
+        categories = await asyncio.to_thread(self.get_all_categories)
         
         for cat in categories:
             try:
@@ -430,7 +429,7 @@ class CategoryService:
            (datetime.now() - self._cache_updated_at).seconds > self.CACHE_TTL_MINUTES * 60:
             await self.refresh_all_indices()
         
-        categories = self.get_all_categories()
+        categories = await asyncio.to_thread(self.get_all_categories)
         
         # 按涨跌幅排序
         sorted_by_change = sorted(
@@ -459,25 +458,20 @@ class CategoryService:
     
     def save_snapshot(self, category_id: int, data: Dict):
         """保存板块指数快照"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         snapshot_time = datetime.now().strftime("%Y-%m-%d %H:%M")
-        cursor.execute("""
-            INSERT OR REPLACE INTO category_snapshots 
-            (category_id, weighted_change_pct, total_aum, fund_count, top_fund_code, snapshot_time)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            category_id,
-            data.get("change_pct", 0),
-            data.get("total_aum", 0),
-            data.get("fund_count", 0),
-            data.get("top_fund_code", ""),
-            snapshot_time
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self._pool.connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO category_snapshots 
+                (category_id, weighted_change_pct, total_aum, fund_count, top_fund_code, snapshot_time)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                category_id,
+                data.get("change_pct", 0),
+                data.get("total_aum", 0),
+                data.get("fund_count", 0),
+                data.get("top_fund_code", ""),
+                snapshot_time
+            ))
 
 
 # 单例
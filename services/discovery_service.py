@@ -13,7 +13,9 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass, asdict
 import logging
+import threading
 import time
+from collections import Counter
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +97,9 @@ class DiscoveryService:
         self.db_path = db_path
         self._llm = None
         self._movers_cache = {} # {limit: (data, timestamp)}
+        # 热度计数缓冲 {(fund_code, field): count}，批量落库
+        self._popularity_buffer: Counter = Counter()
+        self._popularity_lock = threading.Lock()
         self._ensure_db()
     
     def _ensure_db(self):
@@ -300,19 +305,49 @@ class DiscoveryService:
         self._increment_popularity(fund_code, "view_count")
     
     def _increment_popularity(self, fund_code: str, field: str):
-        """增加热度计数"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """增加热度计数并立即落库"""
+        self.buffer_popularity(fund_code, field)
+        self.flush_popularity()
+    
+    def buffer_popularity(self, fund_code: str, field: str):
+        """将热度计数记入内存缓冲，不触及数据库"""
+        with self._popularity_lock:
+            self._popularity_buffer[(fund_code, field)] += 1
+    
+    def flush_popularity(self):
+        """将缓冲中的热度计数合并写入数据库
+        
+        并发调用时由先拿到缓冲的一方整批写入，其余调用直接返回，
+        突发的多次计数因此合并为一次事务。写入失败时计数放回缓冲，
+        留待下次 flush 重试。
+        """
+        with self._popularity_lock:
+            if not self._popularity_buffer:
+                return
+            pending, self._popularity_buffer = self._popularity_buffer, Counter()
         
+        by_field: Dict[str, List[tuple]] = {}
         today = datetime.now().strftime("%Y-%m-%d")
-        cursor.execute(f"""
-            INSERT INTO fund_popularity (fund_code, {field}, date)
-            VALUES (?, 1, ?)
-            ON CONFLICT(fund_code, date) DO UPDATE SET {field} = {field} + 1
-        """, (fund_code, today))
+        for (fund_code, field), count in pending.items():
+            by_field.setdefault(field, []).append((fund_code, count, today))
         
-        conn.commit()
-        conn.close()
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    for field, rows in by_field.items():
+                        conn.executemany(f"""
+                            INSERT INTO fund_popularity (fund_code, {field}, date)
+                            VALUES (?, ?, ?)
+                            ON CONFLICT(fund_code, date) DO UPDATE SET {field} = {field} + excluded.{field}
+                        """, rows)
+            finally:
+                conn.close()
+        except Exception as e:
+            # 事务已整体回滚，放回缓冲不会重复计数
+            with self._popularity_lock:
+                self._popularity_buffer.update(pending)
+            logger.warning(f"热度计数写入失败，{sum(pending.values())} 条计数留在缓冲中待重试: {e}")
     
     # ============ AI 简报 ============
     
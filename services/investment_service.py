@@ -16,9 +16,15 @@ from enum import Enum
 import logging
 import calendar
 
+from utils.database import get_connection_pool
+
 logger = logging.getLogger(__name__)
 
 
+class PlanNotFoundError(LookupError):
+    """计划不存在或不属于当前用户"""
+
+
 # ============ 数据模型 ============
 
 class PlanStatus(Enum):
@@ -600,28 +606,39 @@ class InvestmentPlanService:
         conn.close()
         return plans
     
-    def pause_plan(self, plan_id: int):
+    def pause_plan(self, plan_id: int, user_id: int):
         """暂停计划"""
-        self._update_plan_status(plan_id, PlanStatus.PAUSED.value)
+        self._update_plan_status(plan_id, user_id, PlanStatus.PAUSED.value)
     
-    def resume_plan(self, plan_id: int):
+    def resume_plan(self, plan_id: int, user_id: int):
         """恢复计划"""
-        self._update_plan_status(plan_id, PlanStatus.ACTIVE.value)
+        self._update_plan_status(plan_id, user_id, PlanStatus.ACTIVE.value)
     
-    def cancel_plan(self, plan_id: int):
+    def cancel_plan(self, plan_id: int, user_id: int):
         """取消计划"""
-        self._update_plan_status(plan_id, PlanStatus.CANCELLED.value)
+        self._update_plan_status(plan_id, user_id, PlanStatus.CANCELLED.value)
+    
+    def set_bargain_nav(self, plan_id: int, user_id: int, bargain_nav: float):
+        """设置捡漏区间净值"""
+        self._update_user_plan(plan_id, user_id, "bargain_nav", bargain_nav)
     
-    def _update_plan_status(self, plan_id: int, status: str):
+    def _update_plan_status(self, plan_id: int, user_id: int, status: str):
         """更新计划状态"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE investment_plans SET status = ? WHERE id = ?",
-            (status, plan_id)
-        )
-        conn.commit()
-        conn.close()
+        self._update_user_plan(plan_id, user_id, "status", status)
+    
+    def _update_user_plan(self, plan_id: int, user_id: int, column: str, value: Any):
+        """按 (id, user_id) 更新单个字段，归属校验与更新在同一条语句内完成
+
+        Raises:
+            PlanNotFoundError: 计划不存在或不属于该用户
+        """
+        with get_connection_pool(self.db_path).connection() as conn:
+            cursor = conn.execute(
+                f"UPDATE investment_plans SET {column} = ? WHERE id = ? AND user_id = ?",
+                (value, plan_id, user_id)
+            )
+            if cursor.rowcount == 0:
+                raise PlanNotFoundError(plan_id)
     
     # ============ 数据库辅助 ============
     
@@ -357,6 +357,23 @@ class PortfolioService:
         conn.close()
         return snapshots
     
+    def get_growth_curve(self, user_id: int, days: int = 30) -> List[Dict]:
+        """获取资产增长曲线数据点
+        
+        date 列本身即 YYYY-MM-DD 文本，直接作为图表时间返回，
+        省去逐行构造快照对象和日期解析/格式化。
+        """
+        conn = sqlite3.connect(self.db_path)
+        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        rows = conn.execute("""
+            SELECT date, total_value, total_profit FROM portfolio_snapshots
+            WHERE user_id = ? AND date >= ?
+            ORDER BY date ASC
+        """, (user_id, start_date)).fetchall()
+        conn.close()
+        
+        return [{"time": d, "value": v, "profit": p} for d, v, p in rows]
+    
     # ============ 里程碑引擎 ============
     
     async def _check_achievements(self, user_id: int, snapshot: PortfolioSnapshot):
@@ -444,9 +461,15 @@ class PortfolioService:
         conn.close()
         return achievements
     
-    def get_pending_achievements(self, user_id: int) -> List[Dict]:
-        """获取未完成的成就（进度）"""
-        earned = set(a.achievement_type for a in self.get_achievements(user_id))
+    def get_pending_achievements(self, user_id: int, achievements: Optional[List[Achievement]] = None) -> List[Dict]:
+        """获取未完成的成就（进度）
+        
+        Args:
+            achievements: 已查询出的成就列表，传入时不再重复查询
+        """
+        if achievements is None:
+            achievements = self.get_achievements(user_id)
+        earned = set(a.achievement_type for a in achievements)
         pending = []
         
         for atype, config in ACHIEVEMENT_CONFIG.items():
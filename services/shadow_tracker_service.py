@@ -627,20 +627,27 @@ class ShadowTrackerService:
         self, 
         period: str = "3M",
         sort_by: str = "alpha",
-        limit: int = 20
+        limit: int = 20,
+        min_alpha: Optional[float] = None
     ) -> List[Dict]:
-        """获取博主排行榜"""
+        """获取博主排行榜
+        
+        Args:
+            min_alpha: 仅返回 alpha 大于该值的博主，在 SQL 中过滤
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        alpha_filter = "" if min_alpha is None else "AND p.alpha > ?"
+        params = (period,) + (() if min_alpha is None else (min_alpha,)) + (limit,)
         cursor.execute(f"""
             SELECT b.id, b.name, b.platform, b.followers, p.*
             FROM bloggers b
             LEFT JOIN performance_metrics p ON b.id = p.blogger_id AND p.period = ?
-            WHERE b.is_active = 1
+            WHERE b.is_active = 1 {alpha_filter}
             ORDER BY p.{sort_by} DESC NULLS LAST
             LIMIT ?
-        """, (period, limit))
+        """, params)
         
         ranking = []
         for i, row in enumerate(cursor.fetchall(), 1):
@@ -0,0 +1,31 @@
+"""账户接口回归测试"""
+
+import api.account_api as account_api
+from tools.portfolio_tools import PortfolioTool
+from utils.database import Database
+
+
+def test_account_holdings_with_portfolio_tool_schema(tmp_path, monkeypatch):
+    """holdings 表由 PortfolioTool 先创建时 (无 cost_amount/updated_at 列) 也能查询账户持仓"""
+    db_path = str(tmp_path / "fund_assistant.db")
+    PortfolioTool(db_path=db_path)  # 与 server 启动顺序一致：先于 Database 建表
+    db = Database(db_path)
+    monkeypatch.setattr(account_api, "get_database", lambda: db)
+
+    with db.pooled_connection() as conn:
+        conn.execute(
+            "INSERT INTO accounts (id, user_id, name, is_default, created_at) VALUES (?, ?, ?, ?, ?)",
+            ("acc1", "1", "主账户", 1, "2024-01-01T00:00:00")
+        )
+        conn.execute(
+            "INSERT INTO holdings (user_id, fund_code, fund_name, shares, cost_nav, account_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (1, "110011", "易方达中小盘", 100.0, 1.5, "acc1")
+        )
+
+    holdings = account_api.get_account_holdings("acc1", current_user={"user_id": 1})
+
+    assert len(holdings) == 1
+    assert holdings[0]["fund_code"] == "110011"
+    assert holdings[0]["shares"] == 100.0
+    assert "cost_amount" not in holdings[0]
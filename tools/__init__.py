@@ -1,8 +1,22 @@
-"""工具包初始化"""
+"""工具包初始化
 
-from .fund_tools import FundDataTool
-from .portfolio_tools import PortfolioTool
-from .intelligence_tools import IntelligenceTools
-from .code_interpreter import CodeInterpreterTool
+子模块按需加载：导入 tools.fund_tools 时不会连带加载其余工具模块。
+"""
+
+import importlib
+
+_LAZY_EXPORTS = {
+    "FundDataTool": ".fund_tools",
+    "PortfolioTool": ".portfolio_tools",
+    "IntelligenceTools": ".intelligence_tools",
+    "CodeInterpreterTool": ".code_interpreter",
+}
 
 __all__ = ["FundDataTool", "PortfolioTool", "IntelligenceTools", "CodeInterpreterTool"]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -11,6 +11,8 @@ from dataclasses import dataclass
 import time
 import random
 import functools
+import threading
+from collections import OrderedDict
 
 def rate_limit(min_delay: float = 0.1, max_delay: float = 0.3):
     """Rate limit decorator to prevent 429 errors"""
@@ -1243,8 +1245,8 @@ class MockDataSource(DataSourceBase):
 class MarketDataService:
     """市场数据服务 - 多数据源管理"""
     
-    # 缓存大小限制
-    MAX_CACHE_SIZE = 100
+    # 缓存大小限制 (历史净值等大对象也计入)
+    MAX_CACHE_SIZE = 512
     
     def __init__(self, preferred_source: str = "auto", production_mode: bool = None):
         """
@@ -1260,8 +1262,9 @@ class MarketDataService:
             "mock": MockDataSource(),
         }
         self._preferred = preferred_source
-        self._cache: Dict[str, tuple] = {}  # {key: (data, timestamp)}
-        self._cache_ttl = 300  # 5分钟缓存
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # {key: (data, expires_at)}
+        self._cache_ttl = 300  # 默认 5分钟缓存
+        self._cache_lock = threading.Lock()
         
         # 生产模式检测
         if production_mode is None:
@@ -1312,24 +1315,37 @@ class MarketDataService:
     
     def _get_from_cache(self, key: str) -> Optional[Any]:
         """从缓存获取数据"""
-        if key in self._cache:
-            data, timestamp = self._cache[key]
-            if datetime.now().timestamp() - timestamp < self._cache_ttl:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if time.time() < expires_at:
+                self._cache.move_to_end(key)
                 return data
             del self._cache[key]
         return None
     
-    def _set_cache(self, key: str, data: Any):
-        """设置缓存 (带 LRU 限制)"""
-        # 如果缓存已满，删除最旧的条目
-        if len(self._cache) >= self.MAX_CACHE_SIZE:
-            oldest_key = min(self._cache.keys(), key=lambda k: self._cache[k][1])
-            del self._cache[oldest_key]
-        self._cache[key] = (data, datetime.now().timestamp())
+    def _set_cache(self, key: str, data: Any, ttl: Optional[float] = None):
+        """设置缓存 (带 TTL 与 LRU 限制)
+        
+        Args:
+            key: 缓存键
+            data: 缓存数据（解析后的对象）
+            ttl: 过期秒数，默认 self._cache_ttl
+        """
+        expires_at = time.time() + (self._cache_ttl if ttl is None else ttl)
+        with self._cache_lock:
+            self._cache[key] = (data, expires_at)
+            self._cache.move_to_end(key)
+            # 超出容量时淘汰最久未使用的条目
+            while len(self._cache) > self.MAX_CACHE_SIZE:
+                self._cache.popitem(last=False)
     
     def clear_cache(self):
         """清空缓存"""
-        self._cache.clear()
+        with self._cache_lock:
+            self._cache.clear()
     
     def _get_source_order(self) -> List[str]:
         """获取数据源尝试顺序"""
@@ -1469,7 +1485,8 @@ class MarketDataService:
         results = {}
         missing_codes = []
         
-        for code in fund_codes:
+        # 去重后再查缓存，同一基金只查询一次
+        for code in dict.fromkeys(fund_codes):
             cache_key = f"nav_{code}"
             cached = self._get_from_cache(cache_key)
             if cached:
@@ -1521,7 +1538,7 @@ class MarketDataService:
         return results
 
     def get_fund_details(self, fund_code: str) -> Optional[FundDetailData]:
-        """获取基金详情 (自动回退)"""
+        """获取基金详情 (自动回退, 缓存1小时)"""
         cache_key = f"detail_{fund_code}"
         cached = self._get_from_cache(cache_key)
         if cached:
@@ -1533,7 +1550,8 @@ class MarketDataService:
                 try:
                     result = source.get_fund_details(fund_code)
                     if result:
-                        self._set_cache(cache_key, result)
+                        # 名称、经理等基本信息极少变动，缓存时间长一些
+                        self._set_cache(cache_key, result, ttl=3600)
                         return result
                 except Exception:
                     continue
@@ -1553,14 +1571,14 @@ class MarketDataService:
                     result = source.get_intraday_valuation(fund_code)
                     if result:
                         # 分时数据缓存时间短一些 (60秒)
-                        self._cache[cache_key] = (result, datetime.now().timestamp())
+                        self._set_cache(cache_key, result, ttl=60)
                         return result
                 except Exception:
                     continue
         return None
 
     def get_historical_nav(self, fund_code: str, range_type: str = "y") -> Optional[HistoricalData]:
-        """获取历史净值 (自动回退, 缓存1小时)"""
+        """获取历史净值 (自动回退, 按日期升序, 缓存1小时)"""
         cache_key = f"history_data_{fund_code}_{range_type}"
         cached = self._get_from_cache(cache_key)
         if cached:
@@ -1572,8 +1590,10 @@ class MarketDataService:
                 try:
                     result = source.get_historical_nav(fund_code, range_type)
                     if result:
+                        # 入缓存前按日期升序排好，调用方无需再各自排序
+                        result.points.sort(key=lambda p: p.date)
                         # 历史数据缓存时间长一些 (1小时)
-                        self._cache[cache_key] = (result, datetime.now().timestamp() + 3600)
+                        self._set_cache(cache_key, result, ttl=3600)
                         return result
                 except Exception:
                     continue
@@ -1592,7 +1612,7 @@ class MarketDataService:
                 try:
                     result = source.get_historical_yield(fund_code, range_type)
                     if result:
-                        self._cache[cache_key] = (result, datetime.now().timestamp() + 3600)
+                        self._set_cache(cache_key, result, ttl=3600)
                         return result
                 except Exception:
                     continue
@@ -1612,7 +1632,7 @@ class MarketDataService:
                     result = source.get_fund_diagnostic(fund_code)
                     if result:
                         # 诊断数据变化不快，缓存24小时
-                        self._cache[cache_key] = (result, datetime.now().timestamp() + 86400)
+                        self._set_cache(cache_key, result, ttl=86400)
                         return result
                 except Exception:
                     continue
@@ -1645,7 +1665,7 @@ class MarketDataService:
                             for p in history.points
                         ]
 
-                        self._cache[cache_key] = (result, datetime.now().timestamp() + 3600 * 4) # Cache for 4 hours
+                        self._set_cache(cache_key, result, ttl=3600 * 4) # Cache for 4 hours
                         print(f"DEBUG: get_fund_nav_history computed result, type={type(result)}, len={len(result)}")
                         return result
                 except Exception:
@@ -1665,7 +1685,7 @@ class MarketDataService:
                 try:
                     result = source.get_fund_holdings(fund_code)
                     if result:
-                        self._cache[cache_key] = (result, datetime.now().timestamp() + 3600)
+                        self._set_cache(cache_key, result, ttl=3600)
                         return result
                 except Exception:
                     continue
@@ -91,6 +91,10 @@ class PortfolioTool(Tool):
         Returns:
             持仓列表的 JSON 字符串
         """
+        return json.dumps(self.get_holdings_data(user_id), ensure_ascii=False)
+    
+    def get_holdings_data(self, user_id: int = None) -> Dict[str, Any]:
+        """查看持仓列表，返回原生 dict（供 API 直接序列化，避免 JSON 往返）"""
         effective_user_id = self.get_current_user_id(user_id)
         with self._get_conn() as conn:
             # Check if tags column exists (backward compatibility or if _init_db didn't run)
@@ -119,11 +123,11 @@ class PortfolioTool(Tool):
                 except:
                     h["tags"] = []
         
-        return json.dumps({
+        return {
             "持仓数量": len(holdings),
             "持仓列表": holdings,
             "更新时间": datetime.now().isoformat()
-        }, ensure_ascii=False)
+        }
     
     @tool_action("add_holding", "添加持仓")
     def add_holding(self, fund_code: str, fund_name: str = None, shares: float = 0, cost_nav: float = 0, tags: List[str] = None, user_id: int = None) -> str:
@@ -137,6 +141,10 @@ class PortfolioTool(Tool):
             tags: 标签列表
             user_id: 用户ID
         """
+        return json.dumps(self.add_holding_data(fund_code, fund_name, shares, cost_nav, tags, user_id), ensure_ascii=False)
+    
+    def add_holding_data(self, fund_code: str, fund_name: str = None, shares: float = 0, cost_nav: float = 0, tags: List[str] = None, user_id: int = None) -> Dict[str, Any]:
+        """添加或更新持仓，返回原生 dict"""
         effective_user_id = self.get_current_user_id(user_id)
         fund_code = fund_code.strip()
         
@@ -169,7 +177,7 @@ class PortfolioTool(Tool):
             """, (effective_user_id, fund_code, fund_name, shares, cost_nav, buy_date, tags_json))
         
 
-        return json.dumps({"状态": "成功", "操作": "添加持仓", "基金代码": fund_code}, ensure_ascii=False)
+        return {"状态": "成功", "操作": "添加持仓", "基金代码": fund_code}
 
     @tool_action("batch_add_holdings", "批量添加持仓")
     def batch_add_holdings(self, holdings: List[Dict], user_id: int = None) -> str:
@@ -179,32 +187,41 @@ class PortfolioTool(Tool):
             holdings: 持仓列表，每项包含 fund_code, fund_name, shares, cost_nav
             user_id: 用户ID
         """
+        return json.dumps(self.batch_add_holdings_data(holdings, user_id), ensure_ascii=False)
+    
+    def batch_add_holdings_data(self, holdings: List[Dict], user_id: int = None) -> Dict[str, Any]:
+        """批量添加持仓，返回原生 dict"""
         effective_user_id = self.get_current_user_id(user_id)
         buy_date = datetime.now().strftime("%Y-%m-%d")
         
-        added_count = 0
+        rows = [
+            (effective_user_id, h["fund_code"], h.get("fund_name", ""),
+             h.get("shares", 0), h.get("cost_nav", 1.0), buy_date,
+             json.dumps(h.get("tags", []), ensure_ascii=False))
+            for h in holdings if h.get("fund_code")
+        ]
+        added_count = len(rows)
+        
+        # 单连接单事务 executemany，整批只提交一次
         with self._get_conn() as conn:
-            for h in holdings:
-                fund_code = h.get("fund_code")
-                if not fund_code: continue
-                
-                tags_json = json.dumps(h.get("tags", []), ensure_ascii=False)
-                conn.execute("""
-                    INSERT INTO holdings (user_id, fund_code, fund_name, shares, cost_nav, buy_date, tags)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(user_id, fund_code) DO UPDATE SET
-                        fund_name = excluded.fund_name,
-                        shares = excluded.shares,
-                        cost_nav = excluded.cost_nav
-                """, (effective_user_id, fund_code, h.get("fund_name", ""), 
-                      h.get("shares", 0), h.get("cost_nav", 1.0), buy_date, tags_json))
-                added_count += 1
+            conn.executemany("""
+                INSERT INTO holdings (user_id, fund_code, fund_name, shares, cost_nav, buy_date, tags)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id, fund_code) DO UPDATE SET
+                    fund_name = excluded.fund_name,
+                    shares = excluded.shares,
+                    cost_nav = excluded.cost_nav
+            """, rows)
         
-        return json.dumps({"状态": "成功", "操作": "批量添加", "数量": added_count}, ensure_ascii=False)
+        return {"状态": "成功", "操作": "批量添加", "数量": added_count}
         
     @tool_action("update_tags", "更新持仓标签")
     def update_tags(self, fund_code: str, tags: List[str], user_id: int = None) -> str:
         """更新持仓标签"""
+        return json.dumps(self.update_tags_data(fund_code, tags, user_id), ensure_ascii=False)
+    
+    def update_tags_data(self, fund_code: str, tags: List[str], user_id: int = None) -> Dict[str, Any]:
+        """更新持仓标签，返回原生 dict"""
         effective_user_id = self.get_current_user_id(user_id)
         tags_json = json.dumps(tags, ensure_ascii=False)
         
@@ -214,9 +231,9 @@ class PortfolioTool(Tool):
                 (tags_json, effective_user_id, fund_code)
             )
             if cursor.rowcount > 0:
-                return json.dumps({"状态": "成功", "操作": "更新标签", "基金代码": fund_code}, ensure_ascii=False)
+                return {"状态": "成功", "操作": "更新标签", "基金代码": fund_code}
         
-        return json.dumps({"状态": "失败", "原因": "未找到持仓"}, ensure_ascii=False)
+        return {"状态": "失败", "原因": "未找到持仓"}
     
     @tool_action("remove_holding", "删除持仓")
     def remove_holding(self, fund_code: str, user_id: int = None) -> str:
@@ -229,6 +246,10 @@ class PortfolioTool(Tool):
         Returns:
             操作结果
         """
+        return json.dumps(self.remove_holding_data(fund_code, user_id), ensure_ascii=False)
+    
+    def remove_holding_data(self, fund_code: str, user_id: int = None) -> Dict[str, Any]:
+        """删除持仓，返回原生 dict"""
         effective_user_id = self.get_current_user_id(user_id)
         fund_code = fund_code.strip()
         with self._get_conn() as conn:
@@ -237,9 +258,9 @@ class PortfolioTool(Tool):
                 (effective_user_id, fund_code)
             )
             if cursor.rowcount > 0:
-                return json.dumps({"状态": "已删除", "基金代码": fund_code}, ensure_ascii=False)
+                return {"状态": "已删除", "基金代码": fund_code}
         
-        return json.dumps({"状态": "未找到", "基金代码": fund_code}, ensure_ascii=False)
+        return {"状态": "未找到", "基金代码": fund_code}
     
     @tool_action("calculate_valuation", "计算持仓估值")
     def calculate_valuation(self, user_id: int = None) -> str:
@@ -251,6 +272,10 @@ class PortfolioTool(Tool):
         Returns:
             估值结果的 JSON 字符串
         """
+        return json.dumps(self.get_valuation_data(user_id), ensure_ascii=False, indent=2)
+    
+    def get_valuation_data(self, user_id: int = None) -> Dict[str, Any]:
+        """计算持仓估值，返回原生 dict（供 API 直接序列化，避免 JSON 往返）"""
         effective_user_id = self.get_current_user_id(user_id)
         from tools.fund_tools import FundDataTool
         fund_tool = FundDataTool()
@@ -332,7 +357,7 @@ class PortfolioTool(Tool):
         total_day_change = sum(d["day_change"] for d in details)
         total_day_change_pct = total_day_change / total_value * 100 if total_value > 0 else 0
 
-        return json.dumps({
+        return {
             "update_time": datetime.now().strftime("%Y-%m-%d %H:%M"),
             "total_cost": round(total_cost, 2),
             "total_value": round(total_value, 2),
@@ -341,7 +366,7 @@ class PortfolioTool(Tool):
             "day_change": round(total_day_change, 2),
             "day_change_pct": round(total_day_change_pct, 2),
             "holdings": details
-        }, ensure_ascii=False, indent=2)
+        }
     
     def run(self, parameters: Dict[str, Any]) -> str:
         """默认执行方法"""
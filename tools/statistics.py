@@ -14,13 +14,13 @@ class StatisticsTool:
         Calculate key risk-adjusted performance metrics.
         
         Args:
-            returns: Daily returns (percentage, e.g., 0.01 for 1%)
+            returns: Daily returns (percentage, e.g., 0.01 for 1%); list or float64 ndarray
             risk_free_rate: Annualized risk-free rate (default 2%)
             
         Returns:
             Dict containing sharpe_ratio, max_drawdown, volatility, total_return
         """
-        if not returns or len(returns) < 2:
+        if returns is None or len(returns) < 2:
             return {
                 "sharpe_ratio": 0,
                 "max_drawdown": 0,
@@ -28,7 +28,7 @@ class StatisticsTool:
                 "total_return": 0
             }
             
-        returns_arr = np.array(returns)
+        returns_arr = np.asarray(returns, dtype=np.float64)
         
         # Annualization factor (assuming 252 trading days)
         annual_factor = 252
@@ -50,11 +50,12 @@ class StatisticsTool:
         # Daily risk free rate
         daily_rf = (1 + risk_free_rate) ** (1/annual_factor) - 1
         excess_returns = returns_arr - daily_rf
+        excess_std = np.std(excess_returns, ddof=1)
         
-        if np.std(excess_returns, ddof=1) == 0:
+        if excess_std == 0:
             sharpe_ratio = 0
         else:
-            sharpe_ratio = (np.mean(excess_returns) / np.std(excess_returns, ddof=1)) * np.sqrt(annual_factor)
+            sharpe_ratio = (np.mean(excess_returns) / excess_std) * np.sqrt(annual_factor)
             
         return {
             "sharpe_ratio": round(sharpe_ratio, 2),
@@ -158,48 +159,30 @@ class StatisticsTool:
         Calculate consecutive up/down days stats.
         
         Args:
-            returns: Daily returns (percentage), ordered from oldest to newest.
+            returns: Daily returns (percentage), ordered from oldest to newest; list or ndarray.
         """
-        if not returns:
+        if returns is None or len(returns) == 0:
             return {"type": "flat", "days": 0, "max_up": 0, "max_down": 0}
-            
-        # 1. Current Consecutive
-        # Iterate backwards
+        
+        # Split the sign series into runs of equal sign (NaN counts as flat)
+        signs = np.sign(np.nan_to_num(np.asarray(returns, dtype=np.float64)))
+        starts = np.concatenate(([0], np.flatnonzero(signs[1:] != signs[:-1]) + 1))
+        lengths = np.diff(np.append(starts, signs.size))
+        run_signs = signs[starts]
+        
+        # 1. Current Consecutive (the last run)
         current_type = "flat"
         current_days = 0
-        
-        # Check last day to determine direction
-        last_ret = returns[-1]
-        if last_ret > 0:
+        if run_signs[-1] > 0:
             current_type = "up"
-        elif last_ret < 0:
+            current_days = int(lengths[-1])
+        elif run_signs[-1] < 0:
             current_type = "down"
-            
-        if current_type != "flat":
-            for r in reversed(returns):
-                if (current_type == "up" and r > 0) or (current_type == "down" and r < 0):
-                    current_days += 1
-                else:
-                    break
+            current_days = int(lengths[-1])
         
         # 2. Max Consecutive (Up/Down) in period
-        max_up = 0
-        max_down = 0
-        cur_up = 0
-        cur_down = 0
-        
-        for r in returns:
-            if r > 0:
-                cur_up += 1
-                cur_down = 0
-                max_up = max(max_up, cur_up)
-            elif r < 0:
-                cur_down += 1
-                cur_up = 0
-                max_down = max(max_down, cur_down)
-            else:
-                cur_up = 0
-                cur_down = 0
+        max_up = int(lengths[run_signs > 0].max(initial=0))
+        max_down = int(lengths[run_signs < 0].max(initial=0))
                 
         return {
             "type": current_type,
@@ -2,6 +2,7 @@
 
 import os
 import hashlib
+import functools
 import secrets
 import warnings
 import re
@@ -157,8 +158,9 @@ def create_token(user_id: int, username: str) -> str:
     return f"{header_b64}.{payload_b64}.{signature_b64}"
 
 
-def decode_token(token: str) -> Optional[Dict[str, Any]]:
-    """解码并验证 JWT Token"""
+@functools.lru_cache(maxsize=8192)
+def _verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """校验签名并解析载荷 (按 token 字符串缓存，不检查过期)"""
     import base64
     import json
     import hmac
@@ -184,18 +186,29 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
             data += "=" * padding
             return json.loads(base64.urlsafe_b64decode(data).decode())
         
-        payload = b64decode(payload_b64)
-        
-        # Check expiration
-        if payload.get("exp", 0) < datetime.utcnow().timestamp():
-            return None
-        
-        return payload
+        return b64decode(payload_b64)
     except Exception as e:
         print(f"Token decode error: {e}")
         return None
 
 
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """解码并验证 JWT Token
+    
+    签名校验结果按 token 缓存，过期时间每次都重新检查。
+    """
+    payload = _verify_token(token)
+    if not payload:
+        return None
+    
+    # Check expiration
+    if payload.get("exp", 0) < datetime.utcnow().timestamp():
+        return None
+    
+    # 返回副本，避免调用方修改缓存中的载荷
+    return dict(payload)
+
+
 class UserRepository:
     """用户数据仓库"""
     
@@ -3,11 +3,79 @@
 import sqlite3
 import json
 import os
+import queue
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from contextlib import contextmanager
 
 
+# 每个池化连接建立时执行一次的性能参数
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+class ConnectionPool:
+    """SQLite 连接池
+    
+    复用已调优的连接，避免每个请求都重新打开数据库、设置 PRAGMA。
+    连接以 check_same_thread=False 打开，同一时刻只会被一个借用者持有。
+    
+    连接处于自动提交模式 (isolation_level=None)：只读查询不再隐式 BEGIN/COMMIT，
+    多语句写操作需自行执行 BEGIN IMMEDIATE。
+    """
+    
+    def __init__(self, db_path: str, max_size: int = 8):
+        self.db_path = db_path
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=max_size)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """借用一个连接：显式事务在正常退出时提交、异常时回滚，结束后归还连接池"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_connection_pool(db_path: str) -> ConnectionPool:
+    """获取指定数据库文件的连接池（进程内单例）"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
 class Database:
     """SQLite 数据库管理器"""
     
@@ -16,6 +84,10 @@ class Database:
         os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
         self._init_tables()
     
+    def pooled_connection(self):
+        """从连接池借用连接（上下文管理器），适合高频请求路径"""
+        return get_connection_pool(self.db_path).connection()
+    
     @contextmanager
     def get_connection(self):
         """获取数据库连接（上下文管理器）"""
@@ -110,6 +182,18 @@ class Database:
             except sqlite3.OperationalError:
                 pass
             
+            # 账户列表按默认账户优先、创建时间排序，索引顺序与 ORDER BY 一致以免排序
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_accounts_user_default_created
+                ON accounts(user_id, is_default DESC, created_at ASC)
+            """)
+            
+            # 按账户查询持仓的索引
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_holdings_account_user
+                ON holdings(account_id, user_id)
+            """)
+            
             # 资产快照表 (从 portfolio_service 统一到此处)
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS portfolio_snapshots (
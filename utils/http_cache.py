@@ -0,0 +1,78 @@
+"""HTTP 响应缓存 - 进程内 TTL 缓存 + ETag 条件请求
+
+用于变化很少的只读接口 (标签、排行榜等)：
+- 响应体编码一次后按 key 缓存，TTL 内的重复请求不再查库、不再序列化
+- 附带 ETag，客户端携带 If-None-Match 且未变化时直接返回 304
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+class ResponseCache:
+    """按 key 缓存已编码的 JSON 响应体及其 ETag
+
+    key 约定为元组，首元素为接口名，便于 invalidate 按接口整体失效。
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 256, client_max_age: Optional[int] = None):
+        """
+        Args:
+            ttl: 服务端缓存秒数
+            max_size: 最多缓存的 key 数量
+            client_max_age: 浏览器缓存秒数；为 None 时发送 no-cache，
+                客户端每次都带 ETag 回源验证 (适合有写操作会使其失效的数据)
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache_control = "no-cache" if client_max_age is None else f"max-age={client_max_age}"
+        self._entries: Dict[Hashable, Tuple[float, bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def respond(self, request: Request, key: Tuple, producer: Callable[[], Any]) -> Response:
+        """返回 key 对应的缓存响应，未命中或过期时调用 producer 生成"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None or entry[0] <= now:
+            body = json.dumps(
+                jsonable_encoder(producer()), ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            entry = (now + self.ttl, body, f'"{hashlib.md5(body).hexdigest()}"')
+            with self._lock:
+                if key not in self._entries and len(self._entries) >= self.max_size:
+                    self._evict(now)
+                self._entries[key] = entry
+
+        _, body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": self._cache_control}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self, name: str):
+        """使某个接口的全部缓存失效 (数据被修改后调用)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == name]:
+                del self._entries[key]
+
+    def _evict(self, now: float):
+        """先清理过期项，仍然满时淘汰最早写入的一项 (调用方持有锁)"""
+        for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_size:
+            del self._entries[next(iter(self._entries))]
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates